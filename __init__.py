@@ -3,9 +3,17 @@ Metadata Cleaner - Complete Privacy Protection Tool
 Removes ALL metadata from documents while preserving content.
 """
 
-from .core.cleaner import MetadataCleaner
 from .core.enums import CleaningLevel, FileType
 from .core.result import CleaningResult
 
 __version__ = "1.0.0"
 __all__ = ["MetadataCleaner", "CleaningLevel", "FileType", "CleaningResult"]
+
+
+def __getattr__(name):
+    # MetadataCleaner pulls in every cleaner backend (pikepdf, PIL, ...),
+    # so it is only imported on first use
+    if name == "MetadataCleaner":
+        from .core.cleaner import MetadataCleaner
+        return MetadataCleaner
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -1,12 +1,5 @@
 """File-type specific cleaners."""
 
-from .pdf_cleaner import PDFCleaner
-from .office_cleaner import OfficeCleaner
-from .image_cleaner import ImageCleaner
-from .audio_cleaner import AudioCleaner
-from .video_cleaner import VideoCleaner
-from .text_cleaner import TextCleaner
-
 __all__ = [
     "PDFCleaner",
     "OfficeCleaner",
@@ -15,3 +8,23 @@ __all__ = [
     "VideoCleaner",
     "TextCleaner"
 ]
+
+# Cleaner class -> defining module
+_MODULES = {
+    "PDFCleaner": "pdf_cleaner",
+    "OfficeCleaner": "office_cleaner",
+    "ImageCleaner": "image_cleaner",
+    "AudioCleaner": "audio_cleaner",
+    "VideoCleaner": "video_cleaner",
+    "TextCleaner": "text_cleaner",
+}
+
+
+def __getattr__(name):
+    # Each cleaner pulls in its own backend (pikepdf, PIL, mutagen...), so
+    # it is only imported on first use
+    module = _MODULES.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    from importlib import import_module
+    return getattr(import_module(f".{module}", __name__), name)
@@ -15,9 +15,17 @@ except ImportError:
 
 from .base_cleaner import BaseCleaner
 from ..core.enums import CleaningLevel
+from ..core.utils import copy_file, truncate_value
 
 logger = logging.getLogger(__name__)
 
+# Tags removed at BASIC level
+SENSITIVE_AUDIO_TAGS = frozenset({
+    'TPE1', 'TPE2', 'TALB', 'TIT2', 'TDRC', 'TYER',  # ID3
+    'artist', 'album', 'title', 'date', 'year',  # Vorbis
+    '©ART', '©alb', '©nam', '©day'  # MP4
+})
+
 
 class AudioCleaner(BaseCleaner):
     """Cleaner for audio files."""
@@ -27,25 +35,34 @@ class AudioCleaner(BaseCleaner):
         if not MUTAGEN_AVAILABLE:
             raise ImportError("mutagen is required for audio cleaning. Install with: pip install mutagen")
     
-    def extract_metadata(self, file_path: Path) -> Dict[str, str]:
+    def _extract_metadata(self, file_path: Path) -> Dict[str, str]:
         """Extract metadata from audio file."""
+        try:
+            audio = MutagenFile(file_path)
+        except Exception as e:
+            logger.error(f"Error extracting audio metadata: {e}")
+            return {}
+        
+        return self._collect_metadata(audio)
+    
+    def _collect_metadata(self, audio) -> Dict[str, str]:
+        """Collect metadata from a loaded mutagen file."""
         metadata = {}
         
         try:
-            audio = MutagenFile(file_path)
             if audio is None:
                 return metadata
             
             # Get all tags
             if hasattr(audio, 'tags') and audio.tags:
                 for key, value in audio.tags.items():
-                    metadata[str(key)] = str(value)[:100]
+                    metadata[str(key)] = truncate_value(value)
             
             # Get info
             if hasattr(audio, 'info'):
                 info = audio.info
                 if hasattr(info, 'pprint'):
-                    metadata['Info'] = info.pprint()[:200]
+                    metadata['Info'] = truncate_value(info.pprint(), 200)
         
         except Exception as e:
             logger.error(f"Error extracting audio metadata: {e}")
@@ -57,44 +74,41 @@ class AudioCleaner(BaseCleaner):
         self.reset()
         
         try:
-            # Extract metadata before cleaning
-            self.metadata_removed = self.extract_metadata(input_path)
+            in_place = input_path == output_path
+            
+            # Work on the copy so only one file is ever loaded and the input
+            # is left untouched
+            if not in_place:
+                # The snapshot may already be cached for the input
+                self.metadata_removed = self.extract_metadata(input_path)
+                # Content and mode only; timestamps are not worth keeping
+                copy_file(input_path, output_path)
             
-            # Load audio file
-            audio = MutagenFile(input_path)
+            audio = MutagenFile(output_path)
             
             if audio is None:
+                if not in_place:
+                    output_path.unlink(missing_ok=True)
                 self.add_error("Unsupported audio format")
                 return False
             
+            if in_place:
+                # Snapshot from the file already loaded, before it changes
+                self.metadata_removed = self._collect_metadata(audio)
+            
             # Remove all tags
             if hasattr(audio, 'tags') and audio.tags:
                 if self.level == CleaningLevel.BASIC:
                     # Remove only sensitive tags
-                    sensitive_tags = [
-                        'TPE1', 'TPE2', 'TALB', 'TIT2', 'TDRC', 'TYER',  # ID3
-                        'artist', 'album', 'title', 'date', 'year',  # Vorbis
-                        '©ART', '©alb', '©nam', '©day'  # MP4
-                    ]
-                    
-                    for tag in sensitive_tags:
-                        if tag in audio.tags:
-                            del audio.tags[tag]
+                    for tag in [k for k in audio.tags.keys() if k in SENSITIVE_AUDIO_TAGS]:
+                        del audio.tags[tag]
                 else:
                     # Remove all tags
                     audio.delete()
                     logger.debug("Removed all audio tags")
             
             # Save cleaned file
-            if input_path != output_path:
-                import shutil
-                shutil.copy2(input_path, output_path)
-                audio = MutagenFile(output_path)
-                if audio and hasattr(audio, 'delete'):
-                    audio.delete()
-                    audio.save()
-            else:
-                audio.save()
+            audio.save()
             
             logger.info(f"Successfully cleaned audio: {input_path.name}")
             return True
@@ -1,14 +1,22 @@
 """Base cleaner class for all file type cleaners."""
 
 from abc import ABC, abstractmethod
+from collections import OrderedDict
 from pathlib import Path
 from typing import Dict, List
 import logging
+import threading
 
 from ..core.enums import CleaningLevel
 
 logger = logging.getLogger(__name__)
 
+# Extracted metadata keyed by (cleaner type, level, path, mtime, size),
+# least recently used first
+METADATA_CACHE_SIZE = 256
+_metadata_cache: "OrderedDict[tuple, Dict[str, str]]" = OrderedDict()
+_metadata_cache_lock = threading.Lock()
+
 
 class BaseCleaner(ABC):
     """Abstract base class for file cleaners."""
@@ -33,11 +41,47 @@ class BaseCleaner(ABC):
         """
         pass
     
-    @abstractmethod
     def extract_metadata(self, file_path: Path) -> Dict[str, str]:
         """
         Extract metadata from file for reporting.
         
+        Results are cached until the file's modification time or size
+        changes, so repeated extraction of the same file is free.
+        
+        Args:
+            file_path: Path to file
+            
+        Returns:
+            Dictionary of metadata key-value pairs
+        """
+        file_path = Path(file_path)
+        try:
+            stat = file_path.stat()
+        except OSError:
+            return self._extract_metadata(file_path)
+        
+        key = (type(self), self.level, str(file_path.absolute()),
+               stat.st_mtime_ns, stat.st_size)
+        with _metadata_cache_lock:
+            cached = _metadata_cache.get(key)
+            if cached is not None:
+                _metadata_cache.move_to_end(key)
+                return dict(cached)
+        
+        metadata = self._extract_metadata(file_path)
+        
+        with _metadata_cache_lock:
+            _metadata_cache[key] = dict(metadata)
+            if len(_metadata_cache) > METADATA_CACHE_SIZE:
+                _metadata_cache.popitem(last=False)
+        
+        return metadata
+    
+    @abstractmethod
+    def _extract_metadata(self, file_path: Path) -> Dict[str, str]:
+        """
+        Extract metadata from file, bypassing the cache.
+        
         Args:
             file_path: Path to file
             
@@ -47,10 +91,19 @@ class BaseCleaner(ABC):
         pass
     
     def reset(self):
-        """Reset cleaner state."""
-        self.metadata_removed.clear()
-        self.warnings.clear()
-        self.errors.clear()
+        """
+        Reset cleaner state.
+        
+        Fresh containers are bound rather than the old ones cleared, since
+        earlier CleaningResults may still hold them.
+        """
+        self.metadata_removed = {}
+        self.warnings = []
+        self.errors = []
+    
+    def close(self):
+        """Release resources kept between files; nothing by default."""
+        pass
     
     def add_warning(self, message: str):
         """Add warning message."""
@@ -1,8 +1,11 @@
 """Image metadata cleaner."""
 
 from pathlib import Path
-from typing import Dict
+from typing import Dict, List, Optional, Tuple
 import logging
+import os
+import threading
+import zlib
 
 try:
     from PIL import Image
@@ -19,9 +22,94 @@ except ImportError:
 
 from .base_cleaner import BaseCleaner
 from ..core.enums import CleaningLevel
+from ..core.utils import copy_file, truncate_value
 
 logger = logging.getLogger(__name__)
 
+# Lower-cased suffixes handled as JPEG
+JPEG_SUFFIXES = frozenset({'.jpg', '.jpeg'})
+
+# JPEG markers
+JPEG_SOI = b'\xff\xd8'
+JPEG_EOI = b'\xff\xd9'
+JPEG_SOS = 0xDA
+JPEG_COM = 0xFE
+JPEG_APP0 = 0xE0
+JPEG_APP2 = 0xE2
+JPEG_APP14 = 0xEE
+JPEG_APP15 = 0xEF
+
+# PNG file signature and the chunks holding EXIF and text metadata
+PNG_SIGNATURE = b'\x89PNG\r\n\x1a\n'
+PNG_EXIF = b'eXIf'
+PNG_TEXT_CHUNKS = frozenset({b'tEXt', b'zTXt', b'iTXt'})
+PNG_IEND = b'IEND'
+
+# Decompressed bytes kept per compressed PNG text chunk; values are
+# truncated for reporting anyway
+PNG_TEXT_LIMIT = 64 * 1024
+
+
+def _inflate_png_text(data: bytes) -> bytes:
+    """Decompress a zTXt/iTXt value, up to PNG_TEXT_LIMIT bytes."""
+    try:
+        return zlib.decompressobj().decompress(data, PNG_TEXT_LIMIT)
+    except zlib.error:
+        return b''
+
+
+def _decode_png_text(chunk_type: bytes, payload: bytes) -> Tuple[str, str]:
+    """Decode a tEXt, zTXt or iTXt chunk into (keyword, text)."""
+    keyword, _, rest = payload.partition(b'\0')
+    if chunk_type == b'iTXt':
+        compressed = rest[:1] == b'\x01'
+        # Skip the compression method, language tag and translated keyword
+        _, _, rest = rest[2:].partition(b'\0')
+        _, _, text = rest.partition(b'\0')
+        if compressed:
+            text = _inflate_png_text(text)
+        return keyword.decode('latin-1'), text.decode('utf-8', 'replace')
+    if chunk_type == b'zTXt':
+        rest = _inflate_png_text(rest[1:])
+    return keyword.decode('latin-1'), rest.decode('latin-1')
+
+
+def _read_png_metadata_chunks(file_path: Path) -> Tuple[Optional[bytes], Dict[str, str]]:
+    """
+    Read a PNG's eXIf and text chunks, seeking from chunk header to chunk
+    header so the pixel data is never read.
+    
+    Returns:
+        (eXIf payload or None, text by keyword)
+        
+    Raises:
+        ValueError: If the file is not a PNG
+    """
+    exif = None
+    texts = {}
+    with open(file_path, 'rb') as f:
+        if f.read(len(PNG_SIGNATURE)) != PNG_SIGNATURE:
+            raise ValueError("Not a PNG file")
+        while True:
+            header = f.read(8)
+            if len(header) < 8:
+                break
+            length = int.from_bytes(header[:4], 'big')
+            chunk_type = header[4:]
+            if chunk_type == PNG_IEND:
+                break
+            if chunk_type == PNG_EXIF or chunk_type in PNG_TEXT_CHUNKS:
+                payload = f.read(length)
+                f.seek(4, os.SEEK_CUR)  # CRC
+                if chunk_type == PNG_EXIF:
+                    exif = payload
+                else:
+                    keyword, text = _decode_png_text(chunk_type, payload)
+                    texts[keyword] = text
+            else:
+                f.seek(length + 4, os.SEEK_CUR)
+    return exif, texts
+
 
 class ImageCleaner(BaseCleaner):
     """Cleaner for image files."""
@@ -30,96 +118,305 @@ class ImageCleaner(BaseCleaner):
         super().__init__(level)
         if not PIL_AVAILABLE:
             raise ImportError("Pillow is required for image cleaning. Install with: pip install Pillow")
+        self._et = None
+        # The process talks over one pipe, so callers take turns; threads
+        # sharing this cleaner must hold the lock while they use it
+        self._et_lock = threading.RLock()
+    
+    def _exiftool(self):
+        """Get the cached ExifTool process, starting it on first use."""
+        if self._et is None or not self._et.running:
+            self._et = exiftool.ExifToolHelper()
+            self._et.run()
+        return self._et
+    
+    def close(self):
+        """Stop the cached ExifTool process."""
+        with self._et_lock:
+            if self._et is not None:
+                try:
+                    if self._et.running:
+                        self._et.terminate()
+                except Exception as e:
+                    logger.debug(f"Failed to stop ExifTool: {e}")
+                self._et = None
+    
+    @staticmethod
+    def supports_batch(level: CleaningLevel) -> bool:
+        """Check if images cleaned at this level share an ExifTool process."""
+        return EXIFTOOL_AVAILABLE and level in [CleaningLevel.DEEP, CleaningLevel.PARANOID]
     
-    def extract_metadata(self, file_path: Path) -> Dict[str, str]:
+    def _extract_metadata(self, file_path: Path) -> Dict[str, str]:
         """Extract metadata from image."""
-        metadata = {}
+        # Use exiftool for comprehensive extraction if available; it reads
+        # the same EXIF fields as PIL, so the image is not opened twice
+        if self.supports_batch(self.level):
+            try:
+                with self._et_lock:
+                    exif_metadata = self._exiftool().get_metadata(str(file_path))
+                return self._exiftool_fields(exif_metadata[0]) if exif_metadata else {}
+            except Exception as e:
+                logger.debug(f"ExifTool extraction failed: {e}")
+                self.close()  # Rebuilt on next use
         
+        return self._extract_pil_metadata(file_path)
+    
+    def _extract_pil_metadata(self, file_path: Path) -> Dict[str, str]:
+        """Extract EXIF and info metadata visible to Pillow."""
         try:
             with Image.open(file_path) as img:
-                # EXIF data
+                # Opening reads JPEG headers up to the scan data, but PNG
+                # chunks after the pixel data are only reached by decoding
+                # the whole image; seek to them instead
+                if img.format == 'PNG' and 'exif' not in img.info:
+                    try:
+                        exif_payload, texts = _read_png_metadata_chunks(file_path)
+                    except (OSError, ValueError) as e:
+                        logger.debug(f"PNG chunk scan failed, decoding with PIL: {e}")
+                    else:
+                        exif_data = Image.Exif()
+                        if exif_payload:
+                            exif_data.load(exif_payload)
+                        return self._collect_pil_metadata(img, exif_data, {**img.info, **texts})
+                return self._collect_pil_metadata(img)
+        except Exception as e:
+            logger.error(f"Error extracting image metadata: {e}")
+            return {}
+    
+    def _collect_pil_metadata(self, img, exif_data=None, info=None) -> Dict[str, str]:
+        """
+        Collect EXIF and info metadata from an open image.
+        
+        exif_data and info default to the image's own; callers that read
+        them from the file directly pass them in.
+        """
+        metadata = {}
+        
+        try:
+            # EXIF data
+            if exif_data is None:
                 exif_data = img.getexif()
-                if exif_data:
-                    for tag_id, value in exif_data.items():
-                        tag = TAGS.get(tag_id, tag_id)
-                        metadata[f"EXIF.{tag}"] = str(value)[:100]  # Truncate long values
-                
-                # Image info
-                if hasattr(img, 'info'):
-                    for key, value in img.info.items():
-                        if key not in ['exif']:  # Already handled
-                            metadata[f"Info.{key}"] = str(value)[:100]
+            if exif_data:
+                for tag_id, value in exif_data.items():
+                    tag = TAGS.get(tag_id, tag_id)
+                    metadata[f"EXIF.{tag}"] = truncate_value(value)
+            
+            # Image info
+            if info is None:
+                info = getattr(img, 'info', {})
+            if info:
+                for key, value in info.items():
+                    if key not in ['exif']:  # Already handled
+                        metadata[f"Info.{key}"] = truncate_value(value)
         
         except Exception as e:
             logger.error(f"Error extracting image metadata: {e}")
         
-        # Use exiftool for comprehensive extraction if available
-        if EXIFTOOL_AVAILABLE and self.level in [CleaningLevel.DEEP, CleaningLevel.PARANOID]:
-            try:
-                with exiftool.ExifToolHelper() as et:
-                    exif_metadata = et.get_metadata(str(file_path))
-                    if exif_metadata:
-                        for key, value in exif_metadata[0].items():
-                            if not key.startswith('File:'):  # Skip file system metadata
-                                metadata[key] = str(value)[:100]
-            except Exception as e:
-                logger.debug(f"ExifTool extraction failed: {e}")
-        
         return metadata
     
+    @staticmethod
+    def _exiftool_fields(record: Dict) -> Dict[str, str]:
+        """Convert an ExifTool metadata record to reportable fields."""
+        return {
+            key: truncate_value(value)
+            for key, value in record.items()
+            if not key.startswith('File:')  # Skip file system metadata
+        }
+    
+    @classmethod
+    def clean_batch(
+        cls,
+        pairs: List[Tuple[Path, Path]],
+        level: CleaningLevel = CleaningLevel.DEEP
+    ) -> List[Tuple[bool, "ImageCleaner"]]:
+        """
+        Clean many images sharing a single ExifTool process.
+        
+        Args:
+            pairs: (input_path, output_path) tuples
+            level: Cleaning thoroughness level
+            
+        Returns:
+            One (success, cleaner) tuple per pair; each cleaner holds the
+            metadata_removed, warnings and errors for its file
+        """
+        jobs = [(cls(level), Path(input_path), Path(output_path))
+                for input_path, output_path in pairs]
+        runner = cls(level)
+        try:
+            results = runner._clean_jobs(jobs)
+        finally:
+            runner.close()
+        return [(success, cleaner) for success, (cleaner, _, _) in zip(results, jobs)]
+    
     def clean(self, input_path: Path, output_path: Path) -> bool:
         """Clean image metadata."""
         self.reset()
+        return self._clean_jobs([(self, input_path, output_path)])[0]
+    
+    def _clean_jobs(self, jobs: List[Tuple["ImageCleaner", Path, Path]]) -> List[bool]:
+        """
+        Clean (cleaner, input_path, output_path) jobs through this cleaner's
+        ExifTool process, recording per-file state on each job's cleaner.
+        """
+        results = [False] * len(jobs)
+        if not jobs:
+            return results
         
-        try:
-            # Extract metadata before cleaning
-            self.metadata_removed = self.extract_metadata(input_path)
-            
-            # Use exiftool for thorough cleaning if available
-            if EXIFTOOL_AVAILABLE and self.level in [CleaningLevel.DEEP, CleaningLevel.PARANOID]:
+        # Jobs left for PIL
+        fallback = range(len(jobs))
+        
+        # Use exiftool for thorough cleaning if available
+        if self.supports_batch(self.level):
+            # One command at a time on the shared process
+            with self._et_lock:
                 try:
-                    with exiftool.ExifToolHelper() as et:
-                        # Remove all metadata
-                        et.execute(
-                            b"-all=",
-                            b"-overwrite_original",
-                            str(input_path).encode()
-                        )
-                        
-                        # Copy cleaned file to output
-                        if input_path != output_path:
-                            import shutil
-                            shutil.copy2(input_path, output_path)
-                        
-                        logger.info(f"Cleaned image with exiftool: {input_path.name}")
-                        return True
+                    et = self._exiftool()
                 except Exception as e:
-                    logger.warning(f"ExifTool cleaning failed, falling back to PIL: {e}")
+                    logger.warning(f"ExifTool unavailable, falling back to PIL: {e}")
+                    self.close()  # Rebuilt on next use
+                else:
+                    paths = [str(input_path) for _, input_path, _ in jobs]
+                    
+                    # Extract metadata before cleaning
+                    try:
+                        for (cleaner, _, _), record in zip(jobs, et.get_metadata(paths)):
+                            cleaner.metadata_removed = self._exiftool_fields(record)
+                    except Exception as e:
+                        logger.debug(f"ExifTool extraction failed: {e}")
+                        for cleaner, input_path, _ in jobs:
+                            cleaner.metadata_removed = cleaner._extract_pil_metadata(input_path)
+                    
+                    # Remove all metadata one file per command, so a file
+                    # ExifTool rejects falls back alone and files it has
+                    # already rewritten are not cleaned again
+                    fallback = []
+                    for i, (cleaner, input_path, output_path) in enumerate(jobs):
+                        try:
+                            self._exiftool().execute(
+                                b"-all=",
+                                b"-overwrite_original",
+                                paths[i].encode()
+                            )
+                        except Exception as e:
+                            logger.warning(f"ExifTool cleaning failed for {input_path.name}, falling back to PIL: {e}")
+                            fallback.append(i)
+                            continue
+                        
+                        try:
+                            # Copy cleaned file to output
+                            if input_path != output_path:
+                                copy_file(input_path, output_path)
+                            logger.info(f"Cleaned image with exiftool: {input_path.name}")
+                            results[i] = True
+                        except Exception as e:
+                            cleaner.add_error(f"Failed to clean image: {e}")
+        
+        # Fallback to PIL-based cleaning; JPEGs are first stripped losslessly
+        for i in fallback:
+            cleaner, input_path, output_path = jobs[i]
+            if input_path.suffix.lower() in JPEG_SUFFIXES and \
+                    cleaner._clean_jpeg(input_path, output_path):
+                results[i] = True
+            else:
+                results[i] = cleaner._clean_with_pil(input_path, output_path)
+        return results
+    
+    def _clean_jpeg(self, input_path: Path, output_path: Path) -> bool:
+        """Clean JPEG metadata without decoding, returning False if it cannot."""
+        try:
+            self.metadata_removed = self._extract_pil_metadata(input_path)
+            self._strip_jpeg_markers(input_path, output_path)
+            logger.info(f"Successfully cleaned image: {input_path.name}")
+            return True
+        except (OSError, ValueError) as e:
+            logger.warning(f"JPEG segment stripping failed, re-encoding with PIL: {e}")
+            return False
+    
+    def _strip_jpeg_markers(self, input_path: Path, output_path: Path):
+        """
+        Copy a JPEG without its metadata segments.
+        
+        EXIF/XMP (APP1), IPTC (APP13), comments and other APPn segments are
+        dropped; tables, frame headers and the entropy-coded scan data are
+        copied byte for byte, so the image is not re-compressed.
+        
+        Raises:
+            ValueError: If the file is not a well-formed JPEG
+        """
+        data = Path(input_path).read_bytes()
+        if not data.startswith(JPEG_SOI):
+            raise ValueError("Not a JPEG file")
+        
+        cleaned = bytearray(JPEG_SOI)
+        pos = 2
+        while True:
+            if pos + 4 > len(data) or data[pos] != 0xFF:
+                raise ValueError("Malformed JPEG marker")
+            marker = data[pos + 1]
+            if marker == 0xFF:  # Fill byte
+                pos += 1
+                continue
             
-            # Fallback to PIL-based cleaning
+            end = pos + 2 + int.from_bytes(data[pos + 2:pos + 4], 'big')
+            if end > len(data):
+                raise ValueError("Truncated JPEG segment")
+            
+            if marker == JPEG_SOS:
+                # Scan data runs to the end of image; anything after it
+                # (trailers, appended files) is dropped
+                eoi = data.find(JPEG_EOI, end)
+                if eoi == -1:
+                    raise ValueError("Missing JPEG end of image marker")
+                cleaned += data[pos:eoi + 2]
+                break
+            
+            if self._keep_jpeg_segment(marker, data[pos + 4:end]):
+                cleaned += data[pos:end]
+            pos = end
+        
+        Path(output_path).write_bytes(cleaned)
+    
+    def _keep_jpeg_segment(self, marker: int, payload: bytes) -> bool:
+        """Check if a JPEG header segment is needed to decode the image."""
+        if marker == JPEG_APP0:
+            return payload.startswith(b'JFIF\x00')  # JFXX holds a thumbnail
+        if marker == JPEG_APP14:
+            return payload.startswith(b'Adobe')  # Colour transform for CMYK/YCCK
+        if marker == JPEG_APP2 and payload.startswith(b'ICC_PROFILE\x00'):
+            # Preserve color profile if not in PARANOID mode
+            return self.level != CleaningLevel.PARANOID
+        return not (JPEG_APP0 <= marker <= JPEG_APP15 or marker == JPEG_COM)
+    
+    def _clean_with_pil(self, input_path: Path, output_path: Path) -> bool:
+        """Clean image metadata by re-encoding pixel data with Pillow."""
+        try:
             with Image.open(input_path) as img:
-                # Get image data without metadata
-                data = list(img.getdata())
+                # Collect metadata from the same handle before cleaning
+                self.metadata_removed = self._collect_pil_metadata(img)
                 
-                # Create new image without metadata
-                cleaned_img = Image.new(img.mode, img.size)
-                cleaned_img.putdata(data)
+                # Create new image from the raw pixel buffer, leaving
+                # info, EXIF and TIFF tags behind
+                cleaned_img = Image.frombytes(img.mode, img.size, img.tobytes())
+                if img.mode == 'P':
+                    cleaned_img.putpalette(img.getpalette())
+                
+                # Save without metadata
+                save_kwargs = {}
                 
                 # Preserve color profile if not in PARANOID mode
                 if self.level != CleaningLevel.PARANOID:
                     if 'icc_profile' in img.info:
-                        cleaned_img.info['icc_profile'] = img.info['icc_profile']
-                
-                # Save without metadata
-                save_kwargs = {}
+                        save_kwargs['icc_profile'] = img.info['icc_profile']
                 
                 # Format-specific options
-                if input_path.suffix.lower() in ['.jpg', '.jpeg']:
+                suffix = input_path.suffix.lower()
+                if suffix in JPEG_SUFFIXES:
                     save_kwargs['quality'] = 95
                     save_kwargs['optimize'] = True
                     # Explicitly exclude EXIF
                     save_kwargs['exif'] = b''
-                elif input_path.suffix.lower() == '.png':
+                elif suffix == '.png':
                     save_kwargs['optimize'] = True
                     # Remove all PNG metadata chunks
                     save_kwargs['pnginfo'] = None
@@ -3,16 +3,64 @@
 from pathlib import Path
 from typing import Dict
 import logging
-import zipfile
+import os
+import re
 import shutil
+import zipfile
 import tempfile
 from xml.etree import ElementTree as ET
 
 from .base_cleaner import BaseCleaner
 from ..core.enums import CleaningLevel, FileType
+from ..core.utils import truncate_value
 
 logger = logging.getLogger(__name__)
 
+# Document property parts removed (or scrubbed at BASIC level)
+METADATA_PARTS = ('docProps/core.xml', 'docProps/app.xml', 'docProps/custom.xml')
+
+# Metadata part names as referenced from [Content_Types].xml
+METADATA_PART_NAMES = frozenset('/' + part for part in METADATA_PARTS)
+
+# Override element tag in [Content_Types].xml
+OVERRIDE_TAG = '{http://schemas.openxmlformats.org/package/2006/content-types}Override'
+
+# Lower-cased local names of property fields cleared at BASIC level
+SENSITIVE_TAGS = frozenset({
+    'creator', 'lastmodifiedby', 'created', 'modified',
+    'company', 'manager', 'lastprinted', 'revision'
+})
+
+# Namespace-qualified tag -> local name
+_LOCAL_NAMES: Dict[str, str] = {}
+
+# rsid (revision session ID) attributes, with or without the w: prefix
+RSID_RE = re.compile(rb'\s+(?:w:)?rsid\w+="[^"]*"')
+
+# Media folders whose parts (PNG, JPEG, fonts...) are already compressed
+MEDIA_DIRS = ('word/media/', 'ppt/media/', 'xl/media/', 'Pictures/')
+
+# Buffer size for streaming untouched parts between archives
+ZIP_COPY_BUFFER_SIZE = 64 * 1024
+
+# Main content parts carrying rsid revision attributes, by extension
+CONTENT_PARTS = {
+    '.docx': ('word/document.xml', 'content.xml'),
+    '.odt': ('word/document.xml', 'content.xml'),
+    '.xlsx': ('xl/workbook.xml', 'content.xml'),
+    '.ods': ('xl/workbook.xml', 'content.xml'),
+    '.pptx': ('ppt/presentation.xml', 'content.xml'),
+    '.odp': ('ppt/presentation.xml', 'content.xml'),
+}
+
+
+def _local_name(tag: str) -> str:
+    """Strip the namespace from an ElementTree tag, memoized per tag."""
+    name = _LOCAL_NAMES.get(tag)
+    if name is None:
+        name = _LOCAL_NAMES[tag] = tag.rpartition('}')[2]
+    return name
+
 
 class OfficeCleaner(BaseCleaner):
     """Cleaner for Office documents (DOCX, XLSX, PPTX, ODT, ODS, ODP)."""
@@ -20,187 +68,180 @@ class OfficeCleaner(BaseCleaner):
     def __init__(self, level: CleaningLevel = CleaningLevel.DEEP):
         super().__init__(level)
     
-    def extract_metadata(self, file_path: Path) -> Dict[str, str]:
+    def _extract_metadata(self, file_path: Path) -> Dict[str, str]:
         """Extract metadata from Office document."""
+        try:
+            with zipfile.ZipFile(file_path, 'r') as zf:
+                return self._collect_metadata(zf)
+        except Exception as e:
+            logger.error(f"Error extracting Office metadata: {e}")
+            return {}
+    
+    def _collect_metadata(self, zf: zipfile.ZipFile) -> Dict[str, str]:
+        """Collect metadata from an open Office archive."""
         metadata = {}
         
         try:
-            with zipfile.ZipFile(file_path, 'r') as zf:
-                # Core properties
-                if 'docProps/core.xml' in zf.namelist():
-                    core_xml = zf.read('docProps/core.xml')
-                    root = ET.fromstring(core_xml)
-                    for elem in root.iter():
-                        if elem.text and elem.text.strip():
-                            tag = elem.tag.split('}')[-1]  # Remove namespace
-                            metadata[f"Core.{tag}"] = elem.text[:100]
-                
-                # App properties
-                if 'docProps/app.xml' in zf.namelist():
-                    app_xml = zf.read('docProps/app.xml')
-                    root = ET.fromstring(app_xml)
-                    for elem in root.iter():
-                        if elem.text and elem.text.strip():
-                            tag = elem.tag.split('}')[-1]
-                            metadata[f"App.{tag}"] = elem.text[:100]
-                
-                # Custom properties
-                if 'docProps/custom.xml' in zf.namelist():
-                    metadata["Custom"] = "Present"
-                
+            names = zf.namelist()
+            
+            # Core properties
+            if 'docProps/core.xml' in names:
+                self._collect_properties(zf, 'docProps/core.xml', 'Core', metadata)
+            
+            # App properties
+            if 'docProps/app.xml' in names:
+                self._collect_properties(zf, 'docProps/app.xml', 'App', metadata)
+            
+            # Custom properties
+            if 'docProps/custom.xml' in names:
+                metadata["Custom"] = "Present"
+            
         except Exception as e:
             logger.error(f"Error extracting Office metadata: {e}")
         
         return metadata
     
+    def _collect_properties(
+        self,
+        zf: zipfile.ZipFile,
+        name: str,
+        prefix: str,
+        metadata: Dict[str, str]
+    ):
+        """Stream a document property part into metadata without building a tree."""
+        with zf.open(name) as f:
+            for _, elem in ET.iterparse(f, events=('end',)):
+                if elem.text and elem.text.strip():
+                    metadata[f"{prefix}.{_local_name(elem.tag)}"] = truncate_value(elem.text)
+                elem.clear()
+    
     def clean(self, input_path: Path, output_path: Path) -> bool:
         """Clean Office document metadata."""
         self.reset()
         
         try:
-            # Extract metadata before cleaning
-            self.metadata_removed = self.extract_metadata(input_path)
-            
-            # Create temporary directory for extraction
-            with tempfile.TemporaryDirectory() as temp_dir:
-                temp_path = Path(temp_dir)
-                extract_path = temp_path / "extracted"
-                extract_path.mkdir()
-                
-                # Extract the Office document (it's a ZIP file)
-                with zipfile.ZipFile(input_path, 'r') as zf:
-                    zf.extractall(extract_path)
-                
-                # Remove metadata files
-                metadata_files = [
-                    'docProps/core.xml',
-                    'docProps/app.xml',
-                    'docProps/custom.xml'
-                ]
-                
-                for meta_file in metadata_files:
-                    meta_path = extract_path / meta_file
-                    if meta_path.exists():
-                        if self.level == CleaningLevel.BASIC:
+            content_parts = CONTENT_PARTS.get(input_path.suffix.lower(), ())
+            deep = self.level in [CleaningLevel.DEEP, CleaningLevel.PARANOID]
+            
+            # Write next to the output so input_path == output_path is safe
+            fd, temp_name = tempfile.mkstemp(suffix=output_path.suffix, dir=output_path.parent)
+            os.close(fd)
+            try:
+                # Stream entries straight from the input archive to the output
+                with zipfile.ZipFile(input_path, 'r') as zin, \
+                        zipfile.ZipFile(temp_name, 'w', zipfile.ZIP_DEFLATED) as zout:
+                    # Collect metadata from the same handle before cleaning
+                    self.metadata_removed = self._collect_metadata(zin)
+                    
+                    for item in zin.infolist():
+                        if item.is_dir():
+                            continue
+                        
+                        name = item.filename
+                        if name in METADATA_PARTS and self.level != CleaningLevel.BASIC:
+                            # Remove entirely
+                            logger.debug(f"Removed {name}")
+                            continue
+                        
+                        if name in METADATA_PARTS:
                             # Just clear sensitive fields
-                            self._clean_xml_metadata(meta_path)
+                            data = self._clean_xml_metadata(zin, item)
+                        elif deep and name in content_parts:
+                            # DEEP and PARANOID: Clean content files
+                            data = self._remove_rsid_attributes(zin.read(item), name)
+                        elif name == '[Content_Types].xml' and self.level != CleaningLevel.BASIC:
+                            # Update [Content_Types].xml to remove references
+                            data = self._update_content_types(zin, item)
                         else:
-                            # Remove entirely
-                            meta_path.unlink()
-                            logger.debug(f"Removed {meta_file}")
-                
-                # DEEP and PARANOID: Clean content files
-                if self.level in [CleaningLevel.DEEP, CleaningLevel.PARANOID]:
-                    self._clean_content_files(extract_path, input_path.suffix)
+                            # Stream untouched parts through a bounded buffer
+                            info = self._clean_zip_info(item, modified=False)
+                            info.file_size = item.file_size  # Lets zipfile pick ZIP64
+                            with zin.open(item) as src, zout.open(info, 'w') as dst:
+                                shutil.copyfileobj(src, dst, ZIP_COPY_BUFFER_SIZE)
+                            continue
+                        
+                        zout.writestr(self._clean_zip_info(item, modified=True), data)
                 
-                # Update [Content_Types].xml to remove references
-                self._update_content_types(extract_path)
-                
-                # Repackage as ZIP
-                self._create_office_file(extract_path, output_path)
-                
-                logger.info(f"Successfully cleaned Office document: {input_path.name}")
-                return True
+                shutil.copymode(input_path, temp_name)
+                os.replace(temp_name, output_path)
+            except BaseException:
+                os.unlink(temp_name)
+                raise
+            
+            logger.info(f"Successfully cleaned Office document: {input_path.name}")
+            return True
                 
         except Exception as e:
             self.add_error(f"Failed to clean Office document: {e}")
             return False
     
-    def _clean_xml_metadata(self, xml_path: Path):
-        """Clean sensitive metadata from XML file."""
+    @staticmethod
+    def _clean_zip_info(item: zipfile.ZipInfo, modified: bool) -> zipfile.ZipInfo:
+        """
+        Create a ZIP entry header without timestamps, comments or extra fields.
+        
+        Media is stored rather than deflated again, rewritten XML is
+        deflated, and everything else keeps its original compression.
+        """
+        info = zipfile.ZipInfo(item.filename)
+        if item.filename.startswith(MEDIA_DIRS):
+            info.compress_type = zipfile.ZIP_STORED
+        elif modified:
+            info.compress_type = zipfile.ZIP_DEFLATED
+        else:
+            info.compress_type = item.compress_type
+        return info
+    
+    def _clean_xml_metadata(self, zf: zipfile.ZipFile, item: zipfile.ZipInfo) -> bytes:
+        """Clean sensitive metadata from XML part."""
         try:
-            tree = ET.parse(xml_path)
-            root = tree.getroot()
-            
-            # Tags to clear
-            sensitive_tags = [
-                'creator', 'lastModifiedBy', 'created', 'modified',
-                'company', 'manager', 'lastPrinted', 'revision'
-            ]
+            # Parse straight from the decompressor, no intermediate bytes copy
+            with zf.open(item) as f:
+                root = ET.parse(f).getroot()
             
             for elem in root.iter():
-                tag = elem.tag.split('}')[-1].lower()
-                if tag in sensitive_tags:
+                if _local_name(elem.tag).lower() in SENSITIVE_TAGS:
                     elem.text = ""
             
-            tree.write(xml_path, encoding='utf-8', xml_declaration=True)
+            return ET.tostring(root, encoding='utf-8', xml_declaration=True)
             
         except Exception as e:
             logger.warning(f"Failed to clean XML metadata: {e}")
+            return zf.read(item)
     
-    def _clean_content_files(self, extract_path: Path, file_ext: str):
-        """Clean metadata from content files."""
-        try:
-            # Find main content file
-            content_files = []
-            
-            if file_ext in ['.docx', '.odt']:
-                content_files = list(extract_path.glob('word/document.xml'))
-                content_files.extend(list(extract_path.glob('content.xml')))
-            elif file_ext in ['.xlsx', '.ods']:
-                content_files = list(extract_path.glob('xl/workbook.xml'))
-                content_files.extend(list(extract_path.glob('content.xml')))
-            elif file_ext in ['.pptx', '.odp']:
-                content_files = list(extract_path.glob('ppt/presentation.xml'))
-                content_files.extend(list(extract_path.glob('content.xml')))
-            
-            for content_file in content_files:
-                if content_file.exists():
-                    self._remove_rsid_attributes(content_file)
-        
-        except Exception as e:
-            logger.warning(f"Failed to clean content files: {e}")
-    
-    def _remove_rsid_attributes(self, xml_path: Path):
+    def _remove_rsid_attributes(self, xml_data: bytes, part_name: str) -> bytes:
         """Remove rsid (revision session ID) attributes from XML."""
+        # Parts without any rsid (e.g. LibreOffice output) skip the regex pass
+        if b'rsid' not in xml_data:
+            return xml_data
+        
         try:
-            with open(xml_path, 'r', encoding='utf-8') as f:
-                content = f.read()
+            # Remove rsid attributes (revision tracking); the pattern is
+            # plain ASCII so the part is scanned as bytes without decoding
+            xml_data = RSID_RE.sub(b'', xml_data)
             
-            # Remove rsid attributes (revision tracking)
-            import re
-            content = re.sub(r'\s+w:rsid\w+="[^"]*"', '', content)
-            content = re.sub(r'\s+rsid\w+="[^"]*"', '', content)
-            
-            with open(xml_path, 'w', encoding='utf-8') as f:
-                f.write(content)
-            
-            logger.debug(f"Removed rsid attributes from {xml_path.name}")
+            logger.debug(f"Removed rsid attributes from {part_name}")
+            return xml_data
             
         except Exception as e:
             logger.warning(f"Failed to remove rsid attributes: {e}")
+            return xml_data
     
-    def _update_content_types(self, extract_path: Path):
+    def _update_content_types(self, zf: zipfile.ZipFile, item: zipfile.ZipInfo) -> bytes:
         """Update [Content_Types].xml to remove metadata references."""
         try:
-            content_types_path = extract_path / '[Content_Types].xml'
-            if not content_types_path.exists():
-                return
-            
-            tree = ET.parse(content_types_path)
-            root = tree.getroot()
-            
-            # Remove Override elements for metadata files
-            metadata_parts = [
-                '/docProps/core.xml',
-                '/docProps/app.xml',
-                '/docProps/custom.xml'
+            with zf.open(item) as f:
+                root = ET.parse(f).getroot()
+            
+            # Drop Override elements for metadata files in a single pass
+            root[:] = [
+                child for child in root
+                if not (child.tag == OVERRIDE_TAG
+                        and child.get('PartName', '') in METADATA_PART_NAMES)
             ]
             
-            for override in root.findall('.//{*}Override'):
-                part_name = override.get('PartName', '')
-                if part_name in metadata_parts:
-                    root.remove(override)
-            
-            tree.write(content_types_path, encoding='utf-8', xml_declaration=True)
+            return ET.tostring(root, encoding='utf-8', xml_declaration=True)
             
         except Exception as e:
             logger.warning(f"Failed to update Content_Types: {e}")
-    
-    def _create_office_file(self, extract_path: Path, output_path: Path):
-        """Repackage directory as Office file (ZIP)."""
-        with zipfile.ZipFile(output_path, 'w', zipfile.ZIP_DEFLATED) as zf:
-            for file_path in extract_path.rglob('*'):
-                if file_path.is_file():
-                    arcname = file_path.relative_to(extract_path)
-                    zf.write(file_path, arcname)
+            return zf.read(item)
@@ -24,32 +24,41 @@ class PDFCleaner(BaseCleaner):
         if not PIKEPDF_AVAILABLE:
             raise ImportError("pikepdf is required for PDF cleaning. Install with: pip install pikepdf")
     
-    def extract_metadata(self, file_path: Path) -> Dict[str, str]:
+    def _extract_metadata(self, file_path: Path) -> Dict[str, str]:
         """Extract metadata from PDF."""
-        metadata = {}
         try:
             with pikepdf.open(file_path) as pdf:
-                # Document info dictionary
-                if pdf.docinfo:
-                    for key, value in pdf.docinfo.items():
-                        metadata[f"DocInfo.{key}"] = str(value)
-                
-                # XMP metadata
-                if hasattr(pdf, 'open_metadata') and pdf.open_metadata():
-                    try:
-                        xmp = pdf.open_metadata()
+                return self._collect_metadata(pdf)
+        except Exception as e:
+            logger.error(f"Error extracting PDF metadata: {e}")
+            return {}
+    
+    def _collect_metadata(self, pdf) -> Dict[str, str]:
+        """Collect metadata from an open PDF."""
+        metadata = {}
+        try:
+            # Document info dictionary
+            if pdf.docinfo:
+                for key, value in pdf.docinfo.items():
+                    metadata[f"DocInfo.{key}"] = str(value)
+            
+            # XMP metadata; the stream is only parsed if there is one, and
+            # then only once
+            if '/Metadata' in pdf.Root:
+                try:
+                    if pdf.open_metadata():
                         metadata["XMP"] = "Present"
-                    except:
-                        pass
-                
-                # Trailer info
-                if '/Info' in pdf.trailer:
-                    metadata["Trailer.Info"] = "Present"
-                
-                # Check for JavaScript
-                if '/Names' in pdf.Root and '/JavaScript' in pdf.Root.Names:
-                    metadata["JavaScript"] = "Present"
-                
+                except Exception:
+                    pass
+            
+            # Trailer info
+            if '/Info' in pdf.trailer:
+                metadata["Trailer.Info"] = "Present"
+            
+            # Check for JavaScript
+            if '/Names' in pdf.Root and '/JavaScript' in pdf.Root.Names:
+                metadata["JavaScript"] = "Present"
+            
         except Exception as e:
             logger.error(f"Error extracting PDF metadata: {e}")
         
@@ -61,30 +70,20 @@ class PDFCleaner(BaseCleaner):
         
         try:
             with pikepdf.open(input_path) as pdf:
-                # Extract metadata before cleaning for reporting
-                self.metadata_removed = self.extract_metadata(input_path)
-                
-                # Remove document info dictionary
-                if pdf.docinfo:
-                    for key in list(pdf.docinfo.keys()):
-                        del pdf.docinfo[key]
-                        logger.debug(f"Removed DocInfo: {key}")
+                # Collect metadata from the open document for reporting
+                self.metadata_removed = self._collect_metadata(pdf)
                 
-                # Remove XMP metadata
-                try:
-                    if hasattr(pdf, 'open_metadata'):
-                        with pdf.open_metadata(set_pikepdf_as_editor=False, update_docinfo=False) as meta:
-                            # Clear XMP metadata
-                            pass
-                        del pdf.Root.Metadata
-                        logger.debug("Removed XMP metadata")
-                except:
-                    pass
-                
-                # Remove trailer info
-                if '/Info' in pdf.trailer:
+                # Remove document info dictionary; unlinking it from the
+                # trailer drops every key at once
+                info = pdf.trailer.get('/Info')
+                if info is not None:
                     del pdf.trailer['/Info']
-                    logger.debug("Removed trailer info")
+                    logger.debug(f"Removed DocInfo: {len(info.keys())} keys")
+                
+                # Remove XMP metadata without parsing the packet
+                if '/Metadata' in pdf.Root:
+                    del pdf.Root['/Metadata']
+                    logger.debug("Removed XMP metadata")
                 
                 # DEEP and PARANOID levels
                 if self.level in [CleaningLevel.DEEP, CleaningLevel.PARANOID]:
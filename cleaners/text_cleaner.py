@@ -1,14 +1,158 @@
 """Text document metadata cleaner."""
 
 from pathlib import Path
-from typing import Dict
+from typing import Dict, Tuple
 import logging
+import os
+import re
+import shutil
+import tempfile
 
 from .base_cleaner import BaseCleaner
 from ..core.enums import CleaningLevel
+from ..core.utils import copy_file
 
 logger = logging.getLogger(__name__)
 
+# Start of the info group (contains metadata)
+RTF_INFO_START_RE = re.compile(rb'\{\\info\b')
+
+# Braces and escapes, the only bytes that matter when matching groups
+RTF_GROUP_TOKEN_RE = re.compile(rb'[{}\\]')
+
+# Individual metadata control words outside the info group. Every match
+# ends at or before the next closing brace. RTF has a backslash every few
+# bytes, so one compiled pattern scanning in C beats a Python-level
+# str.find loop that stops at each of them.
+RTF_FIELDS_RE = re.compile(
+    rb'\\(?:author|company|operator|creatim|revtim|printim'
+    rb'|comment|keywords|subject|title|doccomm)\b[^\\}]*'
+)
+
+# A backslash and the control word letters after it
+RTF_CONTROL_WORD_RE = re.compile(rb'\\([a-zA-Z]*)')
+
+# RTF control words have at most 32 letters, so longer runs cannot be
+# the start of a metadata field or of an info group
+RTF_MAX_WORD_LENGTH = 32
+
+# Read size when streaming RTF files
+RTF_CHUNK_SIZE = 256 * 1024
+
+# Control words reported as present by extract_metadata
+RTF_PROBE_FIELDS = {
+    b'author': 'Author',
+    b'company': 'Company',
+    b'creatim': 'CreationTime',
+    b'revtim': 'RevisionTime',
+}
+RTF_PROBE_RE = re.compile(rb'\\(' + b'|'.join(RTF_PROBE_FIELDS) + rb')')
+
+
+def _rtf_group_end(data: bytes, start: int) -> int:
+    """
+    Find the end of the RTF group opening at data[start].
+    
+    Returns:
+        Index just past the matching closing brace, or -1 if the group is
+        not closed within data
+    """
+    depth = 0
+    escaped = -1
+    for match in RTF_GROUP_TOKEN_RE.finditer(data, start):
+        i = match.start()
+        if i == escaped:
+            continue
+        token = data[i]
+        if token == 0x5C:
+            # Backslash: \{, \} and \\ are literal characters
+            escaped = i + 1
+        elif token == 0x7B:
+            depth += 1
+        else:
+            depth -= 1
+            if depth == 0:
+                return i + 1
+    return -1
+
+
+def _rtf_split_tail(data: bytes, pos: int) -> Tuple[int, bytes]:
+    """
+    Find how much of a chunk is settled and what must wait for the next one.
+    
+    Field matches only start at a backslash and end at the next backslash
+    or closing brace, so only the last control word can still be running
+    when the chunk ends. A running field value is removed anyway, so just
+    its control word and delimiter are carried and the next chunk continues
+    the match. Whatever follows the last control word (such as the hex of
+    a picture group), the carried tail stays a few bytes long.
+    
+    Returns:
+        (cut, rest) where data[pos:cut] is settled and rest is prepended
+        to the next chunk
+    """
+    end = len(data)
+    
+    # Bytes that must be carried as they are: a control word cut off by the
+    # chunk end, or an opening brace that may still turn out to be {\info
+    keep = end
+    i = data.rfind(b'\\', pos)
+    if i >= 0:
+        word = RTF_CONTROL_WORD_RE.match(data, i)
+        if word.end() == end and len(word.group(1)) <= RTF_MAX_WORD_LENGTH:
+            keep = i - 1 if i > pos and data[i - 1] == 0x7B else i
+    if keep == end and data.endswith(b'{'):
+        keep = end - 1
+    if keep < end and data[keep] == 0x5C:
+        return keep, data[keep:]
+    
+    # A field match running into the kept bytes (or past the chunk end)
+    j = data.rfind(b'\\', pos, keep)
+    field = RTF_FIELDS_RE.match(data, j) if j >= 0 else None
+    if field is None or field.end() < min(keep + 1, end):
+        return keep, data[keep:]
+    word = RTF_CONTROL_WORD_RE.match(data, j)
+    return j, data[j:min(word.end() + 1, keep)] + data[keep:]
+
+
+def _strip_rtf_metadata(data: bytes, final: bool) -> Tuple[bytes, bytes]:
+    """
+    Remove info groups and metadata control words from RTF data.
+    
+    Args:
+        data: RTF bytes, possibly ending mid-document
+        final: Whether data runs to the end of the document
+        
+    Returns:
+        (cleaned, rest) where rest is the tail that may continue in the
+        next chunk; rest is empty when final
+    """
+    cleaned = []
+    pos = 0
+    while True:
+        match = RTF_INFO_START_RE.search(data, pos)
+        if match is None:
+            break
+        end = _rtf_group_end(data, match.start())
+        if end < 0:
+            if not final and match.end() == len(data):
+                # The control word may go on in the next chunk
+                break
+            if not final:
+                cleaned.append(RTF_FIELDS_RE.sub(b'', data[pos:match.start()]))
+                return b''.join(cleaned), data[match.start():]
+            # Unterminated at end of file; keep the content
+            break
+        cleaned.append(RTF_FIELDS_RE.sub(b'', data[pos:match.start()]))
+        pos = end
+    
+    if final:
+        cut, rest = len(data), b''
+    else:
+        cut, rest = _rtf_split_tail(data, pos)
+    cleaned.append(RTF_FIELDS_RE.sub(b'', data[pos:cut]))
+    return b''.join(cleaned), rest
+
 
 class TextCleaner(BaseCleaner):
     """Cleaner for text documents (TXT, RTF)."""
@@ -16,7 +160,7 @@ class TextCleaner(BaseCleaner):
     def __init__(self, level: CleaningLevel = CleaningLevel.DEEP):
         super().__init__(level)
     
-    def extract_metadata(self, file_path: Path) -> Dict[str, str]:
+    def _extract_metadata(self, file_path: Path) -> Dict[str, str]:
         """Extract metadata from text file."""
         metadata = {}
         
@@ -24,18 +168,14 @@ class TextCleaner(BaseCleaner):
         # RTF files may have metadata in headers
         if file_path.suffix.lower() == '.rtf':
             try:
-                with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-                    content = f.read(1000)  # Read first 1000 chars
+                # RTF is ASCII with escapes, so the header is probed as bytes.
+                # Unbuffered, so only the probed bytes are read
+                with open(file_path, 'rb', buffering=0) as f:
+                    content = f.read(1000)  # Read first 1000 bytes
                     
-                    # Check for common RTF metadata fields
-                    if '\\author' in content:
-                        metadata['Author'] = 'Present'
-                    if '\\company' in content:
-                        metadata['Company'] = 'Present'
-                    if '\\creatim' in content:
-                        metadata['CreationTime'] = 'Present'
-                    if '\\revtim' in content:
-                        metadata['RevisionTime'] = 'Present'
+                    # Check for common RTF metadata fields in one scan
+                    for match in RTF_PROBE_RE.finditer(content):
+                        metadata[RTF_PROBE_FIELDS[match.group(1)]] = 'Present'
             except Exception as e:
                 logger.error(f"Error extracting RTF metadata: {e}")
         
@@ -54,8 +194,7 @@ class TextCleaner(BaseCleaner):
             else:
                 # Plain text - just copy (no metadata to remove)
                 if input_path != output_path:
-                    import shutil
-                    shutil.copy2(input_path, output_path)
+                    copy_file(input_path, output_path)
                 return True
             
         except Exception as e:
@@ -65,36 +204,25 @@ class TextCleaner(BaseCleaner):
     def _clean_rtf(self, input_path: Path, output_path: Path) -> bool:
         """Clean RTF file metadata."""
         try:
-            with open(input_path, 'r', encoding='utf-8', errors='ignore') as f:
-                content = f.read()
-            
-            # Remove RTF metadata fields
-            import re
-            
-            # Remove info group (contains metadata)
-            content = re.sub(r'\\info\{[^}]*\}', '', content)
-            
-            # Remove specific metadata fields
-            metadata_fields = [
-                r'\\author[^\\}]*',
-                r'\\company[^\\}]*',
-                r'\\operator[^\\}]*',
-                r'\\creatim[^\\}]*',
-                r'\\revtim[^\\}]*',
-                r'\\printim[^\\}]*',
-                r'\\comment[^\\}]*',
-                r'\\keywords[^\\}]*',
-                r'\\subject[^\\}]*',
-                r'\\title[^\\}]*',
-                r'\\doccomm[^\\}]*',
-            ]
-            
-            for field in metadata_fields:
-                content = re.sub(field, '', content)
-            
-            # Write cleaned content
-            with open(output_path, 'w', encoding='utf-8') as f:
-                f.write(content)
+            # Write next to the output so input_path == output_path is safe
+            fd, temp_name = tempfile.mkstemp(suffix=output_path.suffix, dir=output_path.parent)
+            try:
+                with open(input_path, 'rb') as src, os.fdopen(fd, 'wb') as dst:
+                    pending = b''
+                    while True:
+                        chunk = src.read(RTF_CHUNK_SIZE)
+                        if not chunk:
+                            break
+                        cleaned, pending = _strip_rtf_metadata(pending + chunk, final=False)
+                        dst.write(cleaned)
+                    
+                    dst.write(_strip_rtf_metadata(pending, final=True)[0])
+                
+                shutil.copymode(input_path, temp_name)
+                os.replace(temp_name, output_path)
+            except BaseException:
+                os.unlink(temp_name)
+                raise
             
             logger.info(f"Successfully cleaned RTF: {input_path.name}")
             return True
@@ -1,69 +1,498 @@
 """Video metadata cleaner."""
 
+from datetime import datetime, timedelta, timezone
 from pathlib import Path
-from typing import Dict
+from typing import BinaryIO, Dict, Iterator, List, Optional, Tuple
+import asyncio
+import json
 import logging
+import os
 import subprocess
 import shutil
 
+try:
+    from mutagen.mp4 import MP4
+    MUTAGEN_AVAILABLE = True
+except ImportError:
+    MUTAGEN_AVAILABLE = False
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
 from .base_cleaner import BaseCleaner
 from ..core.enums import CleaningLevel
+from ..core.utils import truncate_value
 
 logger = logging.getLogger(__name__)
 
+# Containers whose tags are read directly instead of through ffprobe
+MP4_SUFFIXES = frozenset({'.mp4', '.m4v', '.mov'})
+MKV_SUFFIXES = frozenset({'.mkv', '.webm'})
+
+# Matroska element IDs (markers included)
+EBML_HEADER = 0x1A45DFA3
+MKV_SEGMENT = 0x18538067
+MKV_INFO = 0x1549A966
+MKV_TAGS = 0x1254C367
+MKV_TAG = 0x7373
+MKV_TARGETS = 0x63C0
+MKV_TAG_TRACK_UID = 0x63C5
+MKV_SIMPLE_TAG = 0x67C8
+MKV_TAG_NAME = 0x45A3
+MKV_TAG_STRING = 0x4487
+MKV_DATE_UTC = 0x4461
+
+# Segment Info string fields reported as metadata
+MKV_INFO_FIELDS = {
+    0x7BA9: 'title',
+    0x4D80: 'muxing_app',
+    0x5741: 'writing_app',
+}
+
+# Matroska dates count nanoseconds from this instant
+MKV_EPOCH = datetime(2001, 1, 1, tzinfo=timezone.utc)
+
+# Largest tag value read into memory
+MAX_TAG_VALUE_SIZE = 1024 * 1024
+
+# QuickTime metadata value types read as text or numbers; others are
+# reported as binary
+QT_UTF8 = 1
+QT_UTF16 = 2
+QT_SIGNED_INT = 21
+QT_UNSIGNED_INT = 22
+
+# MP4 times count seconds from this instant
+MP4_EPOCH = datetime(1904, 1, 1, tzinfo=timezone.utc)
+
+# QuickTime user data items reported under ffprobe's names; other
+# text items keep their box type (such as ©mak)
+QT_USER_DATA_NAMES = {
+    b'\xa9xyz': 'location',
+}
+
+
+def _read_vint(f: BinaryIO, keep_marker: bool) -> Tuple[int, int]:
+    """
+    Read an EBML variable-length integer.
+    
+    Returns:
+        (value, length in bytes); length is 0 at end of file
+    """
+    first = f.read(1)
+    if not first:
+        return 0, 0
+    
+    length = 1
+    mask = 0x80
+    while not first[0] & mask:
+        mask >>= 1
+        length += 1
+        if length > 8:
+            raise ValueError("Invalid EBML variable-length integer")
+    
+    rest = f.read(length - 1)
+    if len(rest) != length - 1:
+        raise ValueError("Truncated EBML element")
+    
+    value = first[0] if keep_marker else first[0] & (mask - 1)
+    for byte in rest:
+        value = (value << 8) | byte
+    return value, length
+
+
+def _iter_ebml_elements(f: BinaryIO, end: int) -> Iterator[Tuple[int, int]]:
+    """
+    Yield (element id, data size) for each element up to end.
+    
+    The file is positioned at the element data on each yield and moved
+    past it afterwards, whatever the consumer read.
+    """
+    while f.tell() < end:
+        element_id, length = _read_vint(f, keep_marker=True)
+        if not length:
+            return
+        size, size_length = _read_vint(f, keep_marker=False)
+        if size == (1 << (7 * size_length)) - 1:
+            raise ValueError("Unknown-size EBML element")
+        start = f.tell()
+        yield element_id, size
+        f.seek(start + size)
+
+
+def _read_ebml_string(f: BinaryIO, size: int) -> str:
+    """Read a string or UTF-8 element value."""
+    if size > MAX_TAG_VALUE_SIZE:
+        return '<binary data>'
+    return f.read(size).rstrip(b'\x00').decode('utf-8', errors='replace')
+
+
+def _read_mkv_simple_tag(
+    f: BinaryIO,
+    size: int,
+    prefix: str,
+    metadata: Dict[str, str]
+):
+    """Collect a SimpleTag name/value pair and any nested SimpleTags."""
+    name = value = None
+    nested = []
+    for element_id, child_size in _iter_ebml_elements(f, f.tell() + size):
+        if element_id == MKV_TAG_NAME:
+            name = _read_ebml_string(f, child_size)
+        elif element_id == MKV_TAG_STRING:
+            value = _read_ebml_string(f, child_size)
+        elif element_id == MKV_SIMPLE_TAG:
+            nested.append((f.tell(), child_size))
+    
+    if name is None:
+        return
+    metadata[f"{prefix}.{name}"] = truncate_value(value or '')
+    
+    end = f.tell()
+    for start, child_size in nested:
+        f.seek(start)
+        _read_mkv_simple_tag(f, child_size, f"{prefix}.{name}", metadata)
+    f.seek(end)
+
+
+def _read_mkv_tag(f: BinaryIO, size: int, metadata: Dict[str, str]):
+    """Collect one Tag element, keyed by its track target if it has one."""
+    prefix = 'Format'
+    simple_tags = []
+    for element_id, child_size in _iter_ebml_elements(f, f.tell() + size):
+        if element_id == MKV_TARGETS:
+            for target_id, target_size in _iter_ebml_elements(f, f.tell() + child_size):
+                if target_id == MKV_TAG_TRACK_UID:
+                    prefix = f"Track{int.from_bytes(f.read(target_size), 'big')}"
+        elif element_id == MKV_SIMPLE_TAG:
+            simple_tags.append((f.tell(), child_size))
+    
+    end = f.tell()
+    for start, child_size in simple_tags:
+        f.seek(start)
+        _read_mkv_simple_tag(f, child_size, prefix, metadata)
+    f.seek(end)
+
+
+def _read_mkv_metadata(file_path: Path) -> Dict[str, str]:
+    """
+    Read Segment Info and Tags from a Matroska/WebM file.
+    
+    Top-level elements are skipped by size, so clusters are never read.
+    
+    Raises:
+        ValueError: If the file is not Matroska or cannot be walked by size
+    """
+    metadata = {}
+    
+    with open(file_path, 'rb') as f:
+        file_size = f.seek(0, 2)
+        f.seek(0)
+        
+        if _read_vint(f, keep_marker=True)[0] != EBML_HEADER:
+            raise ValueError("Not a Matroska file")
+        header_size, _ = _read_vint(f, keep_marker=False)
+        f.seek(header_size, 1)
+        
+        if _read_vint(f, keep_marker=True)[0] != MKV_SEGMENT:
+            raise ValueError("Matroska segment not found")
+        # A live-written segment may have unknown size; the file end bounds it
+        segment_size, _ = _read_vint(f, keep_marker=False)
+        segment_end = min(f.tell() + segment_size, file_size)
+        
+        for element_id, size in _iter_ebml_elements(f, segment_end):
+            if element_id == MKV_INFO:
+                for field_id, field_size in _iter_ebml_elements(f, f.tell() + size):
+                    if field_id in MKV_INFO_FIELDS:
+                        metadata[f"Format.{MKV_INFO_FIELDS[field_id]}"] = truncate_value(
+                            _read_ebml_string(f, field_size)
+                        )
+                    elif field_id == MKV_DATE_UTC:
+                        nanoseconds = int.from_bytes(f.read(field_size), 'big', signed=True)
+                        created = MKV_EPOCH + timedelta(microseconds=nanoseconds // 1000)
+                        metadata["Format.date_utc"] = created.isoformat()
+            elif element_id == MKV_TAGS:
+                for tag_id, tag_size in _iter_ebml_elements(f, f.tell() + size):
+                    if tag_id == MKV_TAG:
+                        _read_mkv_tag(f, tag_size, metadata)
+    
+    return metadata
+
+
+def _iter_mp4_boxes(f: BinaryIO, end: int) -> Iterator[Tuple[bytes, int]]:
+    """
+    Yield (box type, data size) for each MP4 box up to end.
+    
+    The file is positioned at the box data on each yield and moved past it
+    afterwards, whatever the consumer read.
+    """
+    while f.tell() + 8 <= end:
+        header = f.read(8)
+        if len(header) != 8:
+            return
+        size = int.from_bytes(header[:4], 'big')
+        header_size = 8
+        if size == 1:
+            size = int.from_bytes(f.read(8), 'big')
+            header_size = 16
+        elif size == 0:
+            size = end - f.tell() + 8
+        if size < header_size:
+            raise ValueError("Invalid MP4 box size")
+        start = f.tell()
+        yield header[4:], size - header_size
+        f.seek(start + size - header_size)
+
+
+def _read_qt_value(f: BinaryIO, size: int) -> str:
+    """Read the data box of a QuickTime metadata item."""
+    if size < 8:
+        return ''
+    value_type = int.from_bytes(f.read(8)[:4], 'big') & 0xFFFFFF
+    size -= 8
+    if size > MAX_TAG_VALUE_SIZE:
+        return '<binary data>'
+    value = f.read(size)
+    if value_type == QT_UTF8:
+        return value.decode('utf-8', errors='replace')
+    if value_type == QT_UTF16:
+        return value.decode('utf-16-be', errors='replace')
+    if value_type in (QT_SIGNED_INT, QT_UNSIGNED_INT):
+        return str(int.from_bytes(value, 'big', signed=value_type == QT_SIGNED_INT))
+    return '<binary data>'
+
+
+def _read_mp4_creation_time(f: BinaryIO) -> Optional[str]:
+    """Read the creation time of an mvhd or mdhd box; None when unset."""
+    version = f.read(4)[0]
+    width = 8 if version == 1 else 4
+    seconds = int.from_bytes(f.read(width), 'big')
+    if not seconds:
+        return None
+    return (MP4_EPOCH + timedelta(seconds=seconds)).isoformat()
+
+
+def _read_qt_user_data(f: BinaryIO, end: int, prefix: str, metadata: Dict[str, str]):
+    """Collect the text items (©xyz, ©mak and the like) of a udta box."""
+    for box, size in _iter_mp4_boxes(f, end):
+        if box[0] != 0xA9 or size < 4 or size > MAX_TAG_VALUE_SIZE:
+            continue
+        text_size = int.from_bytes(f.read(2), 'big')
+        f.seek(2, 1)  # Language code
+        value = f.read(min(text_size, size - 4)).decode('utf-8', errors='replace')
+        name = QT_USER_DATA_NAMES.get(box, box.decode('latin-1'))
+        metadata[f"{prefix}.{name}"] = truncate_value(value)
+
+
+def _read_mp4_track(f: BinaryIO, size: int, prefix: str, metadata: Dict[str, str]):
+    """Collect the creation time, language, handler name and user data of a trak box."""
+    for box, box_size in _iter_mp4_boxes(f, f.tell() + size):
+        if box == b'udta':
+            _read_qt_user_data(f, f.tell() + box_size, prefix, metadata)
+        elif box != b'mdia':
+            continue
+        for child, child_size in _iter_mp4_boxes(f, f.tell() + box_size):
+            if child == b'mdhd':
+                start = f.tell()
+                version = f.read(1)[0]
+                f.seek(start)
+                created = _read_mp4_creation_time(f)
+                if created:
+                    metadata[f"{prefix}.creation_time"] = created
+                # Language follows modification time, timescale and duration
+                f.seek(start + (32 if version == 1 else 20))
+                code = int.from_bytes(f.read(2), 'big')
+                if code:
+                    metadata[f"{prefix}.language"] = ''.join(
+                        chr(((code >> shift) & 0x1F) + 0x60) for shift in (10, 5, 0)
+                    )
+            elif child == b'hdlr' and 24 < child_size <= MAX_TAG_VALUE_SIZE:
+                f.seek(24, 1)  # Version, flags, type and reserved fields
+                name = f.read(child_size - 24).rstrip(b'\x00')
+                # QuickTime writes a counted string, ISO a terminated one
+                if name and name[0] == len(name) - 1:
+                    name = name[1:]
+                if name:
+                    metadata[f"{prefix}.handler_name"] = name.decode('utf-8', errors='replace')
+
+
+def _read_qt_keyed_items(f: BinaryIO, size: int, metadata: Dict[str, str]):
+    """Collect the ilst items of a moov/meta box, named through its keys box."""
+    keys = []
+    items = []
+    meta_end = f.tell() + size
+    # The ISO form of meta has version and flags before its boxes; the
+    # QuickTime form starts with a box straight away
+    if f.read(4) != b'\x00\x00\x00\x00':
+        f.seek(-4, 1)
+    for box, box_size in _iter_mp4_boxes(f, meta_end):
+        if box == b'keys':
+            f.seek(4, 1)  # Version and flags
+            count = int.from_bytes(f.read(4), 'big')
+            for _ in range(count):
+                key_size = int.from_bytes(f.read(4), 'big')
+                if key_size < 8:
+                    raise ValueError("Invalid QuickTime key size")
+                f.seek(4, 1)  # Key namespace
+                keys.append(f.read(key_size - 8).decode('utf-8', errors='replace'))
+        elif box == b'ilst':
+            for item, item_size in _iter_mp4_boxes(f, f.tell() + box_size):
+                # Items are named by their 1-based index into keys
+                index = int.from_bytes(item, 'big')
+                for data_box, data_size in _iter_mp4_boxes(f, f.tell() + item_size):
+                    if data_box == b'data':
+                        items.append((index, _read_qt_value(f, data_size)))
+    
+    for index, value in items:
+        if 0 < index <= len(keys):
+            metadata[f"Format.{keys[index - 1]}"] = truncate_value(value)
+
+
+def _read_quicktime_metadata(file_path: Path) -> Dict[str, str]:
+    """
+    Read the moov metadata of an MP4/MOV file that mutagen does not report.
+    
+    That is the movie and track creation times, track languages and handler
+    names, QuickTime user data text such as the ©xyz location, and items
+    named through a keys box (such as com.apple.quicktime.location.ISO6709)
+    rather than by four-letter names. Names follow ffprobe's. Top-level
+    boxes are skipped by size, so media data is never read.
+    
+    Raises:
+        ValueError: If the boxes cannot be walked by size
+    """
+    metadata = {}
+    
+    with open(file_path, 'rb') as f:
+        file_size = f.seek(0, 2)
+        f.seek(0)
+        
+        for box, size in _iter_mp4_boxes(f, file_size):
+            if box != b'moov':
+                continue
+            track = 0
+            for child, child_size in _iter_mp4_boxes(f, f.tell() + size):
+                if child == b'mvhd':
+                    created = _read_mp4_creation_time(f)
+                    if created:
+                        metadata["Format.creation_time"] = created
+                elif child == b'udta':
+                    _read_qt_user_data(f, f.tell() + child_size, 'Format', metadata)
+                elif child == b'trak':
+                    _read_mp4_track(f, child_size, f"Stream{track}", metadata)
+                    track += 1
+                elif child == b'meta':
+                    _read_qt_keyed_items(f, child_size, metadata)
+    
+    return metadata
+
 
 class VideoCleaner(BaseCleaner):
     """Cleaner for video files using FFmpeg."""
     
+    # Absolute FFmpeg path, resolved once and shared by all instances.
+    # subprocess only uses posix_spawn (no fork) for an executable given
+    # with its directory and close_fds=False, which is safe because
+    # Python opens files non-inheritable.
+    _ffmpeg_path: Optional[str] = None
+    
     def __init__(self, level: CleaningLevel = CleaningLevel.DEEP):
         super().__init__(level)
         self._check_ffmpeg()
     
-    def _check_ffmpeg(self):
+    @classmethod
+    def _check_ffmpeg(cls):
         """Check if FFmpeg is available."""
-        try:
-            subprocess.run(
-                ['ffmpeg', '-version'],
-                capture_output=True,
-                check=True
-            )
-        except (subprocess.CalledProcessError, FileNotFoundError):
+        if cls._ffmpeg_path:
+            return
+        
+        # A PATH lookup is enough; no process is spawned
+        ffmpeg_path = shutil.which('ffmpeg')
+        if ffmpeg_path is None:
             raise RuntimeError("FFmpeg is required for video cleaning. Install from: https://ffmpeg.org/")
+        
+        cls._ffmpeg_path = os.path.abspath(ffmpeg_path)
+    
+    def _extract_metadata(self, file_path: Path) -> Dict[str, str]:
+        """
+        Extract metadata from video file.
+        
+        MP4/MOV and Matroska tags are read directly from the container;
+        other formats, files the direct readers cannot handle, and files
+        where they find nothing (ffprobe may still know a field they do not)
+        go through ffprobe.
+        """
+        suffix = file_path.suffix.lower()
+        try:
+            if suffix in MP4_SUFFIXES and MUTAGEN_AVAILABLE:
+                metadata = self._extract_mp4_metadata(file_path)
+                if metadata:
+                    return metadata
+            elif suffix in MKV_SUFFIXES:
+                metadata = _read_mkv_metadata(file_path)
+                if metadata:
+                    return metadata
+        except Exception as e:
+            logger.debug(f"Direct container read failed for {file_path.name}, using ffprobe: {e}")
+        
+        return self._extract_ffprobe_metadata(file_path)
     
-    def extract_metadata(self, file_path: Path) -> Dict[str, str]:
-        """Extract metadata from video file."""
+    def _extract_mp4_metadata(self, file_path: Path) -> Dict[str, str]:
+        """Read MP4/MOV tags with mutagen, and the moov metadata it skips."""
+        metadata = {}
+        
+        tags = MP4(file_path).tags
+        if tags:
+            for key, value in tags.items():
+                metadata[f"Format.{key}"] = truncate_value(value)
+        
+        metadata.update(_read_quicktime_metadata(file_path))
+        return metadata
+    
+    def _extract_ffprobe_metadata(self, file_path: Path) -> Dict[str, str]:
+        """Extract metadata with ffprobe."""
         metadata = {}
         
         try:
-            # Use ffprobe to extract metadata
+            ffprobe_path = shutil.which('ffprobe')
+            if ffprobe_path is None:
+                raise FileNotFoundError("ffprobe not found")
+            
+            # Use ffprobe to extract metadata; only the tag sections are
+            # printed, so codec details and side data are never serialized
             result = subprocess.run(
                 [
-                    'ffprobe',
+                    os.path.abspath(ffprobe_path),
                     '-v', 'quiet',
                     '-print_format', 'json',
-                    '-show_format',
-                    '-show_streams',
+                    '-show_entries', 'format_tags:stream_tags',
                     str(file_path)
                 ],
                 capture_output=True,
-                text=True,
+                close_fds=False,
                 check=True
             )
             
-            import json
-            data = json.loads(result.stdout)
+            # Both parsers take the raw bytes, so stdout is never decoded to str
+            if ORJSON_AVAILABLE:
+                data = orjson.loads(result.stdout)
+            else:
+                data = json.loads(result.stdout)
             
             # Extract format metadata
             if 'format' in data and 'tags' in data['format']:
                 for key, value in data['format']['tags'].items():
-                    metadata[f"Format.{key}"] = str(value)[:100]
+                    metadata[f"Format.{key}"] = truncate_value(value)
             
             # Extract stream metadata
             if 'streams' in data:
                 for i, stream in enumerate(data['streams']):
                     if 'tags' in stream:
                         for key, value in stream['tags'].items():
-                            metadata[f"Stream{i}.{key}"] = str(value)[:100]
+                            metadata[f"Stream{i}.{key}"] = truncate_value(value)
         
         except Exception as e:
             logger.error(f"Error extracting video metadata: {e}")
@@ -78,40 +507,78 @@ class VideoCleaner(BaseCleaner):
             # Extract metadata before cleaning
             self.metadata_removed = self.extract_metadata(input_path)
             
-            # Build FFmpeg command
-            cmd = [
-                'ffmpeg',
-                '-i', str(input_path),
-                '-map_metadata', '-1',  # Remove all metadata
-                '-c', 'copy',  # Copy streams without re-encoding
-                '-y',  # Overwrite output file
-            ]
+            # Run FFmpeg; stderr is only read on failure
+            result = subprocess.run(
+                self._build_command(input_path, output_path),
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.PIPE,
+                close_fds=False
+            )
             
-            # Additional options for different cleaning levels
-            if self.level in [CleaningLevel.DEEP, CleaningLevel.PARANOID]:
-                cmd.extend([
-                    '-map_chapters', '-1',  # Remove chapters
-                    '-fflags', '+bitexact',  # Reproducible output
-                    '-flags:v', '+bitexact',
-                    '-flags:a', '+bitexact',
-                ])
+            return self._check_result(input_path, result.returncode, result.stderr)
             
-            cmd.append(str(output_path))
+        except Exception as e:
+            self.add_error(f"Failed to clean video: {e}")
+            return False
+    
+    async def clean_async(self, input_path: Path, output_path: Path) -> bool:
+        """
+        Clean video metadata without blocking the event loop.
+        
+        Same as clean(), but FFmpeg is awaited as an asyncio subprocess so
+        many files can be supervised from a single thread.
+        """
+        self.reset()
+        
+        try:
+            # ffprobe may be needed, so keep extraction off the loop
+            self.metadata_removed = await asyncio.to_thread(self.extract_metadata, input_path)
             
-            # Run FFmpeg
-            result = subprocess.run(
-                cmd,
-                capture_output=True,
-                text=True
+            process = await asyncio.create_subprocess_exec(
+                *self._build_command(input_path, output_path),
+                stdout=asyncio.subprocess.DEVNULL,
+                stderr=asyncio.subprocess.PIPE,
+                close_fds=False
             )
+            _, stderr = await process.communicate()
             
-            if result.returncode != 0:
-                self.add_error(f"FFmpeg error: {result.stderr}")
-                return False
-            
-            logger.info(f"Successfully cleaned video: {input_path.name}")
-            return True
+            return self._check_result(input_path, process.returncode, stderr)
             
         except Exception as e:
             self.add_error(f"Failed to clean video: {e}")
             return False
+    
+    def _build_command(self, input_path: Path, output_path: Path) -> List[str]:
+        """Build the FFmpeg command for this cleaning level."""
+        cmd = [
+            self._ffmpeg_path,
+            '-hide_banner',
+            '-loglevel', 'error',  # Only errors reach stderr
+            '-nostats',
+            '-i', str(input_path),
+            '-map_metadata', '-1',  # Remove all metadata
+            '-c', 'copy',  # Copy streams without re-encoding
+            '-y',  # Overwrite output file
+        ]
+        
+        # Additional options for different cleaning levels
+        if self.level in [CleaningLevel.DEEP, CleaningLevel.PARANOID]:
+            cmd.extend([
+                '-map_chapters', '-1',  # Remove chapters
+                # Reproducible output; streams are copied, so no encoder
+                # runs and codec-level bitexact flags would have no effect
+                '-fflags', '+bitexact',
+            ])
+        
+        cmd.append(str(output_path))
+        return cmd
+    
+    def _check_result(self, input_path: Path, returncode: int, stderr: bytes) -> bool:
+        """Record the outcome of an FFmpeg run."""
+        if returncode != 0:
+            message = stderr.decode('utf-8', errors='replace').strip()
+            self.add_error(f"FFmpeg error: {message}")
+            return False
+        
+        logger.info(f"Successfully cleaned video: {input_path.name}")
+        return True
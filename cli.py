@@ -2,17 +2,12 @@
 
 import argparse
 import sys
-import json
 import logging
+from functools import lru_cache
 from pathlib import Path
-from colorama import init, Fore, Style
 
-from .core.cleaner import MetadataCleaner
 from .core.enums import CleaningLevel
 
-# Initialize colorama for Windows support
-init()
-
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -21,60 +16,99 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 
-def print_banner():
-    """Print application banner."""
-    banner = f"""
-{Fore.CYAN}╔═══════════════════════════════════════════════════════════╗
+BANNER = """╔═══════════════════════════════════════════════════════════╗
 ║           METADATA CLEANER - Privacy Protection          ║
 ║              Remove ALL metadata from files               ║
-╚═══════════════════════════════════════════════════════════╝{Style.RESET_ALL}
-"""
-    print(banner)
+╚═══════════════════════════════════════════════════════════╝"""
+
+
+class _NoColor:
+    """Stand-in for colorama's Fore and Style that emits no escapes."""
+    
+    def __getattr__(self, name):
+        return ''
+
+
+@lru_cache(maxsize=None)
+def _colors():
+    """Return (Fore, Style), without colors when stdout is not a terminal."""
+    if not sys.stdout.isatty():
+        # Piped or redirected output gets plain text
+        return _NoColor(), _NoColor()
+    
+    from colorama import init, Fore, Style
+    
+    # Only the Windows console needs ANSI translation
+    if sys.platform == 'win32':
+        init()
+    return Fore, Style
+
+
+def print_banner():
+    """Print application banner."""
+    Fore, Style = _colors()
+    sys.stdout.write(f"\n{Fore.CYAN}{BANNER}{Style.RESET_ALL}\n\n")
 
 
 def print_result(result):
     """Print cleaning result."""
+    Fore, Style = _colors()
     if result.success:
-        print(f"{Fore.GREEN}✓{Style.RESET_ALL} {result.file_path.name}")
-        print(f"  Size: {result.original_size:,} → {result.cleaned_size:,} bytes "
-              f"({Fore.YELLOW}-{result.size_reduction_percent:.1f}%{Style.RESET_ALL})")
-        print(f"  Metadata removed: {Fore.CYAN}{result.metadata_count}{Style.RESET_ALL} fields")
-        
-        if result.warnings:
-            for warning in result.warnings:
-                print(f"  {Fore.YELLOW}⚠{Style.RESET_ALL} {warning}")
+        lines = [
+            f"{Fore.GREEN}✓{Style.RESET_ALL} {result.file_path.name}",
+            f"  Size: {result.original_size:,} → {result.cleaned_size:,} bytes "
+            f"({Fore.YELLOW}-{result.size_reduction_percent:.1f}%{Style.RESET_ALL})",
+            f"  Metadata removed: {Fore.CYAN}{result.metadata_count}{Style.RESET_ALL} fields",
+        ]
+        lines.extend(f"  {Fore.YELLOW}⚠{Style.RESET_ALL} {warning}" for warning in result.warnings)
     else:
-        print(f"{Fore.RED}✗{Style.RESET_ALL} {result.file_path.name}")
-        for error in result.errors:
-            print(f"  {Fore.RED}Error:{Style.RESET_ALL} {error}")
+        lines = [f"{Fore.RED}✗{Style.RESET_ALL} {result.file_path.name}"]
+        lines.extend(f"  {Fore.RED}Error:{Style.RESET_ALL} {error}" for error in result.errors)
     
-    print()
+    # One write per result instead of one per line
+    sys.stdout.write("\n".join(lines) + "\n\n")
 
 
 def print_batch_summary(batch_result):
     """Print batch cleaning summary."""
-    print(f"\n{Fore.CYAN}{'='*60}{Style.RESET_ALL}")
-    print(f"{Fore.CYAN}SUMMARY{Style.RESET_ALL}")
-    print(f"{Fore.CYAN}{'='*60}{Style.RESET_ALL}")
-    print(f"Total files: {batch_result.total_files}")
-    print(f"{Fore.GREEN}Successful:{Style.RESET_ALL} {batch_result.successful}")
-    print(f"{Fore.RED}Failed:{Style.RESET_ALL} {batch_result.failed}")
+    Fore, Style = _colors()
+    rule = f"{Fore.CYAN}{'='*60}{Style.RESET_ALL}"
+    lines = [
+        "",
+        rule,
+        f"{Fore.CYAN}SUMMARY{Style.RESET_ALL}",
+        rule,
+        f"Total files: {batch_result.total_files}",
+        f"{Fore.GREEN}Successful:{Style.RESET_ALL} {batch_result.successful}",
+        f"{Fore.RED}Failed:{Style.RESET_ALL} {batch_result.failed}",
+    ]
     if batch_result.skipped > 0:
-        print(f"{Fore.YELLOW}Skipped:{Style.RESET_ALL} {batch_result.skipped}")
-    print(f"Success rate: {batch_result.success_rate:.1f}%")
-    print(f"Total size reduction: {batch_result.total_size_reduction:,} bytes")
-    print(f"Processing time: {batch_result.total_time:.2f}s")
-    print(f"{Fore.CYAN}{'='*60}{Style.RESET_ALL}\n")
+        lines.append(f"{Fore.YELLOW}Skipped:{Style.RESET_ALL} {batch_result.skipped}")
+    lines.extend([
+        f"Success rate: {batch_result.success_rate:.1f}%",
+        f"Total size reduction: {batch_result.total_size_reduction:,} bytes",
+        f"Processing time: {batch_result.total_time:.2f}s",
+        rule,
+    ])
+    sys.stdout.write("\n".join(lines) + "\n\n")
 
 
 def save_report(result, report_path: Path):
     """Save cleaning report to JSON file."""
+    import json
+    
+    Fore, Style = _colors()
     try:
-        with open(report_path, 'w', encoding='utf-8') as f:
-            if hasattr(result, 'to_dict'):
-                json.dump(result.to_dict(), f, indent=2)
-            else:
-                json.dump(result, f, indent=2)
+        if hasattr(result, 'write_json'):
+            # Batch reports are streamed one result at a time
+            with open(report_path, 'wb') as f:
+                result.write_json(f)
+        else:
+            with open(report_path, 'w', encoding='utf-8') as f:
+                if hasattr(result, 'to_dict'):
+                    json.dump(result.to_dict(), f, indent=2)
+                else:
+                    json.dump(result, f, indent=2)
         print(f"{Fore.GREEN}Report saved:{Style.RESET_ALL} {report_path}")
     except Exception as e:
         print(f"{Fore.RED}Failed to save report:{Style.RESET_ALL} {e}")
@@ -158,6 +192,11 @@ Examples:
         default=4,
         help='Number of parallel workers (default: 4)'
     )
+    parser.add_argument(
+        '--processes',
+        action='store_true',
+        help='Use worker processes instead of threads (faster for CPU-bound PDF/image batches)'
+    )
     
     # Output options
     parser.add_argument(
@@ -183,6 +222,11 @@ Examples:
     
     args = parser.parse_args()
     
+    # Imported only after parsing so --help stays fast
+    from .core.cleaner import MetadataCleaner
+    
+    Fore, Style = _colors()
+    
     # Configure logging
     if args.verbose:
         logging.getLogger().setLevel(logging.DEBUG)
@@ -237,7 +281,8 @@ Examples:
             batch_result = cleaner.clean_folder(
                 args.folder,
                 recursive=args.recursive,
-                max_workers=args.workers
+                max_workers=args.workers,
+                use_processes=args.processes
             )
             
             if not args.quiet:
@@ -258,7 +303,8 @@ Examples:
             
             batch_result = cleaner.clean_files(
                 args.files,
-                max_workers=args.workers
+                max_workers=args.workers,
+                use_processes=args.processes
             )
             
             if not args.quiet:
@@ -280,6 +326,8 @@ Examples:
             import traceback
             traceback.print_exc()
         sys.exit(1)
+    finally:
+        cleaner.close()
 
 
 if __name__ == '__main__':
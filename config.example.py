@@ -135,14 +135,15 @@ VERBOSE_LOGGING = False
 SAVE_INTERMEDIATE_FILES = False  # For debugging
 
 
+# Setting names, collected and sorted once at import
+_CONFIG_KEYS = tuple(sorted(
+    name for name in globals() if name.isupper() and not name.startswith('_')
+))
+
+
 def get_config():
     """Get configuration as dictionary."""
-    import inspect
-    config = {}
-    for name, value in globals().items():
-        if name.isupper() and not name.startswith('_'):
-            config[name] = value
-    return config
+    return {name: globals()[name] for name in _CONFIG_KEYS}
 
 
 def print_config():
@@ -150,7 +151,7 @@ def print_config():
     config = get_config()
     print("Current Configuration:")
     print("=" * 60)
-    for key, value in sorted(config.items()):
+    for key, value in config.items():
         print(f"{key:30} = {value}")
     print("=" * 60)
 
@@ -1,24 +1,50 @@
 """Main metadata cleaner orchestrator."""
 
 from pathlib import Path
-from typing import Optional, List
+from typing import Dict, Iterable, Optional, List, Tuple, Union
+import asyncio
 import logging
+import multiprocessing
+import os
 import time
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from concurrent.futures import (
+    FIRST_COMPLETED, ThreadPoolExecutor, ProcessPoolExecutor, as_completed, wait
+)
 
 from .enums import CleaningLevel, FileType
 from .result import CleaningResult, BatchCleaningResult
 from .utils import (
-    calculate_file_hash, create_backup, verify_file_integrity,
-    get_file_size, is_supported_file
-)
-from ..cleaners import (
-    PDFCleaner, OfficeCleaner, ImageCleaner,
-    AudioCleaner, VideoCleaner, TextCleaner
+    calculate_content_hash, create_backup, create_hashed_backup,
+    get_file_size, get_file_sizes, hash_files, is_supported_file,
+    is_supported_name, iter_file_entries
 )
+from .. import cleaners
 
 logger = logging.getLogger(__name__)
 
+# FileType -> key of the cleaner that handles it
+_TYPE_TO_CLEANER = {
+    FileType.PDF: 'pdf',
+    **{ft: 'office' for ft in (FileType.DOCX, FileType.XLSX, FileType.PPTX,
+                               FileType.ODT, FileType.ODS, FileType.ODP)},
+    **{ft: 'image' for ft in FileType if ft.is_image()},
+    **{ft: 'audio' for ft in FileType if ft.is_audio()},
+    **{ft: 'video' for ft in FileType if ft.is_video()},
+    FileType.TXT: 'text',
+    FileType.RTF: 'text',
+}
+
+# Cleaner key -> class name in the cleaners package, which imports each
+# cleaner (and its backend: pikepdf, Pillow, mutagen...) on first use
+_CLEANER_CLASSES = {
+    'pdf': 'PDFCleaner',
+    'office': 'OfficeCleaner',
+    'image': 'ImageCleaner',
+    'audio': 'AudioCleaner',
+    'video': 'VideoCleaner',
+    'text': 'TextCleaner',
+}
+
 
 class MetadataCleaner:
     """Main metadata cleaner class."""
@@ -44,15 +70,12 @@ class MetadataCleaner:
         self.verify = verify
         self.backup_dir = Path(backup_dir) if backup_dir else None
         
-        # Initialize cleaners
-        self.cleaners = {
-            'pdf': PDFCleaner(level),
-            'office': OfficeCleaner(level),
-            'image': ImageCleaner(level),
-            'audio': AudioCleaner(level),
-            'video': VideoCleaner(level),
-            'text': TextCleaner(level),
-        }
+        # Cleaners are created on first use, so a run only imports and
+        # starts the backends its file types need
+        self.cleaners = {}
+        
+        # Lower-cased suffix -> cleaner, filled in as suffixes are seen
+        self._suffix_cleaners = {}
     
     def clean_file(
         self,
@@ -69,8 +92,13 @@ class MetadataCleaner:
         Returns:
             CleaningResult object
         """
-        file_path = Path(file_path)
-        output_path = Path(output_path) if output_path else file_path
+        # Batches already pass Paths; only convert what is not one
+        if not isinstance(file_path, Path):
+            file_path = Path(file_path)
+        if not output_path:
+            output_path = file_path
+        elif not isinstance(output_path, Path):
+            output_path = Path(output_path)
         
         start_time = time.time()
         
@@ -94,15 +122,65 @@ class MetadataCleaner:
                 errors=[f"Unsupported file type: {file_path.suffix}"]
             )
         
-        # Get original file info
+        # Get appropriate cleaner
+        try:
+            cleaner = self._get_cleaner(file_path)
+        except (ImportError, RuntimeError) as e:
+            # Backend missing (library or FFmpeg)
+            cleaner = None
+            error = str(e)
+        else:
+            error = f"No cleaner available for: {file_path.suffix}"
+        if not cleaner:
+            return CleaningResult(
+                file_path=file_path,
+                success=False,
+                original_size=get_file_size(file_path),
+                cleaned_size=0,
+                errors=[error]
+            )
+        
+        prepared = self._prepare(file_path)
+        if isinstance(prepared, CleaningResult):
+            return prepared
+        
+        # Clean the file
+        success = cleaner.clean(file_path, output_path)
+        
+        return self._finish(
+            file_path, output_path, success, cleaner, prepared,
+            time.time() - start_time
+        )
+    
+    def _prepare(
+        self,
+        file_path: Path,
+        content_hash_before: Optional[str] = None
+    ) -> Union[CleaningResult, Tuple[int, Optional[str], Optional[Path]]]:
+        """
+        Record original file info and create a backup before cleaning.
+        
+        Args:
+            file_path: File about to be cleaned
+            content_hash_before: Hash already computed by a batch, if any
+        
+        Returns:
+            (original_size, content_hash_before, backup_path), or a failed
+            CleaningResult if the backup could not be created
+        """
         original_size = get_file_size(file_path)
-        content_hash_before = calculate_file_hash(file_path) if self.verify else None
         
         # Create backup if requested
         backup_path = None
         if self.backup:
             try:
-                backup_path = create_backup(file_path, self.backup_dir)
+                if self.verify and content_hash_before is None:
+                    # Hash the file from the same read that copies it
+                    backup_path, content_hash_before = create_hashed_backup(
+                        file_path, self.backup_dir
+                    )
+                else:
+                    backup_path = create_backup(file_path, self.backup_dir)
             except Exception as e:
                 logger.error(f"Failed to create backup: {e}")
                 return CleaningResult(
@@ -113,49 +191,183 @@ class MetadataCleaner:
                     errors=[f"Failed to create backup: {e}"]
                 )
         
-        # Get appropriate cleaner
-        cleaner = self._get_cleaner(file_path)
-        if not cleaner:
-            return CleaningResult(
-                file_path=file_path,
-                success=False,
-                original_size=original_size,
-                cleaned_size=0,
-                errors=[f"No cleaner available for: {file_path.suffix}"]
-            )
+        if self.verify and content_hash_before is None:
+            content_hash_before = calculate_content_hash(file_path)
         
-        # Clean the file
-        success = cleaner.clean(file_path, output_path)
+        return original_size, content_hash_before, backup_path
+    
+    def _finish(
+        self,
+        file_path: Path,
+        output_path: Path,
+        success: bool,
+        cleaner,
+        prepared: Tuple[int, Optional[str], Optional[Path]],
+        processing_time: float,
+        content_hash_after: Optional[str] = None
+    ) -> CleaningResult:
+        """
+        Verify the cleaned output and build its CleaningResult.
+        
+        content_hash_after may be passed in when a batch already hashed
+        the output.
+        """
+        original_size, content_hash_before, backup_path = prepared
         
-        # Get results
-        cleaned_size = get_file_size(output_path) if output_path.exists() else 0
-        content_hash_after = calculate_file_hash(output_path) if self.verify and output_path.exists() else None
-        processing_time = time.time() - start_time
+        # Get results; one stat gives existence and size
+        try:
+            cleaned_size = output_path.stat().st_size
+            output_exists = True
+        except OSError:
+            cleaned_size = 0
+            output_exists = False
+        if self.verify and content_hash_after is None and output_exists:
+            content_hash_after = calculate_content_hash(output_path)
         
-        # Verify integrity if requested
-        if self.verify and success:
-            if not verify_file_integrity(file_path, output_path):
-                cleaner.add_warning("File integrity verification failed")
+        # Verify integrity if requested (as verify_file_integrity: the
+        # output must exist and have content)
+        if self.verify and success and cleaned_size == 0:
+            cleaner.add_warning("File integrity verification failed")
         
+        # Copies, so the result stays intact when the cleaner is reused,
+        # possibly by another thread
         return CleaningResult(
             file_path=file_path,
             success=success,
             original_size=original_size,
             cleaned_size=cleaned_size,
-            metadata_removed=cleaner.metadata_removed,
-            errors=cleaner.errors,
-            warnings=cleaner.warnings,
+            metadata_removed=dict(cleaner.metadata_removed),
+            errors=list(cleaner.errors),
+            warnings=list(cleaner.warnings),
             processing_time=processing_time,
             backup_path=backup_path,
             content_hash_before=content_hash_before,
             content_hash_after=content_hash_after
         )
     
+    def _clean_image_batch(self, file_paths: List[Path]) -> List[CleaningResult]:
+        """Clean images in place through one shared ExifTool process."""
+        start_time = time.time()
+        results = []
+        jobs = []
+        
+        # Hash the whole batch up front, every file on its own thread. With
+        # backups on, _prepare hashes each file from the read that copies
+        # it instead, so the inputs are never read twice
+        hashes_before = {}
+        if self.verify and not self.backup:
+            existing = [file_path for file_path in file_paths if file_path.exists()]
+            hashes_before = dict(zip(existing, hash_files(existing)))
+        
+        for file_path in file_paths:
+            if not file_path.exists():
+                results.append(CleaningResult(
+                    file_path=file_path,
+                    success=False,
+                    original_size=0,
+                    cleaned_size=0,
+                    errors=[f"File not found: {file_path}"]
+                ))
+                continue
+            
+            prepared = self._prepare(file_path, hashes_before.get(file_path))
+            if isinstance(prepared, CleaningResult):
+                results.append(prepared)
+            else:
+                jobs.append((file_path, prepared))
+        
+        if not jobs:
+            return results
+        
+        outcomes = cleaners.ImageCleaner.clean_batch(
+            [(file_path, file_path) for file_path, _ in jobs],
+            self.level
+        )
+        
+        hashes_after = [None] * len(jobs)
+        if self.verify:
+            cleaned = [file_path for file_path, _ in jobs if file_path.exists()]
+            by_path = dict(zip(cleaned, hash_files(cleaned)))
+            hashes_after = [by_path.get(file_path) for file_path, _ in jobs]
+        
+        # Share the batch time evenly across its files
+        processing_time = (time.time() - start_time) / len(jobs)
+        for (file_path, prepared), (success, cleaner), content_hash_after in zip(
+                jobs, outcomes, hashes_after):
+            results.append(self._finish(
+                file_path, file_path, success, cleaner, prepared, processing_time,
+                content_hash_after
+            ))
+        
+        return results
+    
+    def _clean_video_batch(
+        self,
+        file_paths: List[Path],
+        max_workers: int
+    ) -> List[CleaningResult]:
+        """
+        Clean videos in place from one event loop.
+        
+        FFmpeg does all the work out of process, so the files are
+        supervised as asyncio subprocesses, at most max_workers at a time,
+        instead of each holding a pool thread.
+        """
+        async def clean_all() -> List[CleaningResult]:
+            semaphore = asyncio.Semaphore(max_workers)
+            
+            async def clean_one(file_path: Path) -> CleaningResult:
+                async with semaphore:
+                    return await self._clean_video_async(file_path)
+            
+            return await asyncio.gather(*(clean_one(f) for f in file_paths))
+        
+        return asyncio.run(clean_all())
+    
+    async def _clean_video_async(self, file_path: Path) -> CleaningResult:
+        """Clean one video in place as part of _clean_video_batch."""
+        start_time = time.time()
+        
+        if not file_path.exists():
+            return CleaningResult(
+                file_path=file_path,
+                success=False,
+                original_size=0,
+                cleaned_size=0,
+                errors=[f"File not found: {file_path}"]
+            )
+        
+        # One cleaner per file, since they run concurrently
+        try:
+            cleaner = cleaners.VideoCleaner(self.level)
+        except (ImportError, RuntimeError) as e:
+            return CleaningResult(
+                file_path=file_path,
+                success=False,
+                original_size=get_file_size(file_path),
+                cleaned_size=0,
+                errors=[str(e)]
+            )
+        
+        # Hashing and backups are blocking file I/O
+        prepared = await asyncio.to_thread(self._prepare, file_path)
+        if isinstance(prepared, CleaningResult):
+            return prepared
+        
+        success = await cleaner.clean_async(file_path, file_path)
+        
+        return await asyncio.to_thread(
+            self._finish, file_path, file_path, success, cleaner, prepared,
+            time.time() - start_time
+        )
+    
     def clean_folder(
         self,
         folder_path: str | Path,
         recursive: bool = False,
-        max_workers: int = 4
+        max_workers: int = 4,
+        use_processes: bool = False,
+        result_stream: Optional[Path] = None
     ) -> BatchCleaningResult:
         """
         Clean metadata from all supported files in a folder.
@@ -164,45 +376,53 @@ class MetadataCleaner:
             folder_path: Path to folder
             recursive: Whether to process subfolders
             max_workers: Number of parallel workers
+            use_processes: Whether to clean in worker processes (see clean_many)
+            result_stream: JSONL file to write results to instead of keeping
+                them in memory (see BatchCleaningResult)
             
         Returns:
             BatchCleaningResult object
         """
         folder_path = Path(folder_path)
-        batch_result = BatchCleaningResult()
+        batch_result = BatchCleaningResult(stream_path=result_stream)
         start_time = time.time()
         
         if not folder_path.exists() or not folder_path.is_dir():
             logger.error(f"Folder not found: {folder_path}")
+            batch_result.close()
             return batch_result
         
-        # Find all supported files
-        pattern = '**/*' if recursive else '*'
-        all_files = [f for f in folder_path.glob(pattern) if f.is_file()]
-        supported_files = [f for f in all_files if is_supported_file(f)]
+        # Stream supported files to the workers while the folder is walked
+        skipped = 0
         
-        logger.info(f"Found {len(supported_files)} supported files in {folder_path}")
+        def supported_files():
+            nonlocal skipped
+            exclude = [self.backup_dir] if self.backup_dir else []
+            # Filter on the listed names; only supported files become Paths
+            for entry in iter_file_entries(folder_path, recursive, exclude):
+                if is_supported_name(entry.name):
+                    yield Path(entry.path)
+                else:
+                    skipped += 1
         
-        # Process files in parallel
-        with ThreadPoolExecutor(max_workers=max_workers) as executor:
-            futures = {
-                executor.submit(self.clean_file, file_path): file_path
-                for file_path in supported_files
-            }
-            
-            for future in as_completed(futures):
-                result = future.result()
-                batch_result.add_result(result)
+        try:
+            self._clean_into(batch_result, supported_files(), max_workers, use_processes)
+        finally:
+            batch_result.close()
+        
+        logger.info(f"Processed {batch_result.total_files} supported files in {folder_path}")
         
         batch_result.total_time = time.time() - start_time
-        batch_result.skipped = len(all_files) - len(supported_files)
+        batch_result.skipped = skipped
         
         return batch_result
     
     def clean_files(
         self,
         file_paths: List[str | Path],
-        max_workers: int = 4
+        max_workers: int = 4,
+        use_processes: bool = False,
+        result_stream: Optional[Path] = None
     ) -> BatchCleaningResult:
         """
         Clean metadata from multiple files.
@@ -210,44 +430,218 @@ class MetadataCleaner:
         Args:
             file_paths: List of file paths
             max_workers: Number of parallel workers
+            use_processes: Whether to clean in worker processes (see clean_many)
+            result_stream: JSONL file to write results to instead of keeping
+                them in memory (see BatchCleaningResult)
             
         Returns:
             BatchCleaningResult object
         """
-        batch_result = BatchCleaningResult()
+        batch_result = BatchCleaningResult(stream_path=result_stream)
         start_time = time.time()
         
-        # Process files in parallel
-        with ThreadPoolExecutor(max_workers=max_workers) as executor:
-            futures = {
-                executor.submit(self.clean_file, file_path): file_path
-                for file_path in file_paths
-            }
-            
-            for future in as_completed(futures):
-                result = future.result()
-                batch_result.add_result(result)
+        # Largest first, so small files fill in behind the big ones instead
+        # of one big file finishing the batch alone on a single worker
+        paths = [p if isinstance(p, Path) else Path(p) for p in file_paths]
+        sizes = _sizes_by_directory(paths)
+        paths.sort(key=lambda p: sizes[p.parent].get(p.name, 0), reverse=True)
+        try:
+            self._clean_into(batch_result, paths, max_workers, use_processes)
+        finally:
+            batch_result.close()
         
         batch_result.total_time = time.time() - start_time
         
         return batch_result
     
+    def _clean_into(
+        self,
+        batch_result: BatchCleaningResult,
+        file_paths: Iterable[Path],
+        max_workers: int,
+        use_processes: bool = False
+    ):
+        """
+        Clean files in parallel, adding each result to batch_result.
+        
+        file_paths may be a lazy iterable. Files are submitted as they
+        arrive, with at most a few per worker waiting in the queue, so
+        cleaning starts before a large folder has been fully walked.
+        """
+        if use_processes:
+            pairs = [(file_path, None) for file_path in file_paths]
+            for result in self.clean_many(pairs, max_workers):
+                batch_result.add_result(result)
+            return
+        
+        # Images share one ExifTool process and videos one event loop, so
+        # they are collected and cleaned together once the walk is done.
+        # Batching support is looked up with the first image, so runs
+        # without images never import the image backend
+        batch_images = None
+        image_files = []
+        video_files = []
+        max_pending = max_workers * 4
+        
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            pending = set()
+            
+            def submit(file_path: Path):
+                nonlocal pending
+                pending.add(executor.submit(self.clean_file, file_path))
+                if len(pending) >= max_pending:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        batch_result.add_result(future.result())
+            
+            for file_path in file_paths:
+                file_type = FileType.from_extension(file_path.suffix)
+                if file_type.is_image():
+                    if batch_images is None:
+                        batch_images = cleaners.ImageCleaner.supports_batch(self.level)
+                    if batch_images:
+                        image_files.append(file_path)
+                        continue
+                elif file_type.is_video():
+                    video_files.append(file_path)
+                    continue
+                submit(file_path)
+            
+            # A lone image or video gains nothing from batching
+            if len(image_files) < 2:
+                for file_path in image_files:
+                    submit(file_path)
+                image_files = []
+            if len(video_files) < 2:
+                for file_path in video_files:
+                    submit(file_path)
+                video_files = []
+            
+            if image_files:
+                image_future = executor.submit(self._clean_image_batch, image_files)
+            if video_files:
+                video_future = executor.submit(
+                    self._clean_video_batch, video_files, max_workers
+                )
+            
+            for future in as_completed(pending):
+                batch_result.add_result(future.result())
+            
+            if image_files:
+                for result in image_future.result():
+                    batch_result.add_result(result)
+            if video_files:
+                for result in video_future.result():
+                    batch_result.add_result(result)
+    
+    def clean_many(
+        self,
+        pairs: List[Tuple[str | Path, Optional[str | Path]]],
+        max_workers: Optional[int] = None
+    ) -> List[CleaningResult]:
+        """
+        Clean metadata from many files across a pool of worker processes.
+        
+        PDF linearization and image re-encoding are CPU-bound and hold the
+        GIL, so separate processes scale where threads cannot.
+        
+        Args:
+            pairs: (file_path, output_path) tuples; output_path may be None
+                to overwrite the input
+            max_workers: Number of worker processes (defaults to CPU count)
+            
+        Returns:
+            List of CleaningResult objects in the same order as pairs
+        """
+        if not pairs:
+            return []
+        
+        workers = min(max_workers or os.cpu_count() or 1, len(pairs))
+        chunksize = min(4, max(1, len(pairs) // workers))
+        
+        # Workers start from a fresh forkserver interpreter rather than a fork
+        # of this process, whose threads (pools, ExifTool readers) do not
+        # survive fork; each then imports only the cleaners it uses
+        if "forkserver" in multiprocessing.get_all_start_methods():
+            mp_context = multiprocessing.get_context("forkserver")
+        else:
+            mp_context = None
+        
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=mp_context,
+            initializer=_init_worker,
+            initargs=(self.level, self.backup, self.verify, self.backup_dir)
+        ) as executor:
+            return list(executor.map(_clean_one, pairs, chunksize=chunksize))
+    
+    def close(self):
+        """Stop backend processes the cleaners keep between files, such as ExifTool."""
+        for cleaner in list(self.cleaners.values()):
+            cleaner.close()
+    
     def _get_cleaner(self, file_path: Path):
         """Get appropriate cleaner for file type."""
-        file_type = FileType.from_extension(file_path.suffix)
-        
-        if file_type == FileType.PDF:
-            return self.cleaners['pdf']
-        elif file_type in [FileType.DOCX, FileType.XLSX, FileType.PPTX,
-                          FileType.ODT, FileType.ODS, FileType.ODP]:
-            return self.cleaners['office']
-        elif file_type.is_image():
-            return self.cleaners['image']
-        elif file_type.is_audio():
-            return self.cleaners['audio']
-        elif file_type.is_video():
-            return self.cleaners['video']
-        elif file_type in [FileType.TXT, FileType.RTF]:
-            return self.cleaners['text']
-        
-        return None
+        suffix = file_path.suffix.lower()
+        cleaner = self._suffix_cleaners.get(suffix)
+        if cleaner is not None:
+            return cleaner
+        
+        key = _TYPE_TO_CLEANER.get(FileType.from_extension(suffix))
+        if key is None:
+            return None
+        
+        cleaner = self.cleaners.get(key)
+        if cleaner is None:
+            # Worker threads may race here; setdefault keeps a single one
+            cleaner_class = getattr(cleaners, _CLEANER_CLASSES[key])
+            cleaner = self.cleaners.setdefault(key, cleaner_class(self.level))
+        self._suffix_cleaners[suffix] = cleaner
+        return cleaner
+
+
+# Cleaner reused by every task in a clean_many worker process
+_worker_cleaner: Optional[MetadataCleaner] = None
+
+
+def _init_worker(
+    level: CleaningLevel,
+    backup: bool,
+    verify: bool,
+    backup_dir: Optional[Path]
+):
+    """Create the per-process cleaner for clean_many workers."""
+    global _worker_cleaner
+    _worker_cleaner = MetadataCleaner(
+        level=level,
+        backup=backup,
+        verify=verify,
+        backup_dir=backup_dir
+    )
+
+
+def _clean_one(pair: Tuple[str | Path, Optional[str | Path]]) -> CleaningResult:
+    """Clean one (file_path, output_path) pair in a worker process."""
+    file_path, output_path = pair
+    return _worker_cleaner.clean_file(file_path, output_path)
+
+
+def _sizes_by_directory(paths: List[Path]) -> Dict[Path, Dict[str, int]]:
+    """
+    Get file sizes for scheduling, from one listing per directory.
+    
+    Returns:
+        Sizes by file name, by directory; files that cannot be read are
+        left out
+    """
+    names = {}
+    for path in paths:
+        names.setdefault(path.parent, set()).add(path.name)
+    
+    sizes = {}
+    for directory, wanted in names.items():
+        try:
+            sizes[directory] = get_file_sizes(directory, wanted)
+        except OSError:
+            sizes[directory] = {}
+    return sizes
@@ -52,34 +52,49 @@ class FileType(Enum):
     @classmethod
     def from_extension(cls, ext: str):
         """Get FileType from file extension."""
-        ext = ext.lower().lstrip('.')
-        for file_type in cls:
-            if file_type.value == ext:
-                return file_type
-        return cls.UNKNOWN
+        # Lower-case extensions, as Path.suffix usually gives them, are a
+        # single lookup; anything else is normalised first
+        file_type = _EXT_MAP.get(ext)
+        if file_type is None:
+            file_type = _EXT_MAP.get(ext.lower().lstrip('.'), cls.UNKNOWN)
+        return file_type
     
     def is_document(self) -> bool:
         """Check if file type is a document."""
-        return self in {
-            FileType.PDF, FileType.DOCX, FileType.XLSX, FileType.PPTX,
-            FileType.ODT, FileType.ODS, FileType.ODP, FileType.RTF, FileType.TXT
-        }
+        return self in _DOCUMENT_TYPES
     
     def is_image(self) -> bool:
         """Check if file type is an image."""
-        return self in {
-            FileType.JPEG, FileType.JPG, FileType.PNG, FileType.TIFF,
-            FileType.TIF, FileType.GIF, FileType.BMP, FileType.WEBP
-        }
+        return self in _IMAGE_TYPES
     
     def is_audio(self) -> bool:
         """Check if file type is audio."""
-        return self in {
-            FileType.MP3, FileType.FLAC, FileType.WAV, FileType.M4A, FileType.OGG
-        }
+        return self in _AUDIO_TYPES
     
     def is_video(self) -> bool:
         """Check if file type is video."""
-        return self in {
-            FileType.MP4, FileType.AVI, FileType.MKV, FileType.MOV, FileType.WMV
-        }
+        return self in _VIDEO_TYPES
+
+
+# Lower-case extension, with and without the dot -> FileType
+_EXT_MAP = {
+    key: ft
+    for ft in FileType if ft is not FileType.UNKNOWN
+    for key in (ft.value, f".{ft.value}")
+}
+
+# File type categories
+_DOCUMENT_TYPES = frozenset({
+    FileType.PDF, FileType.DOCX, FileType.XLSX, FileType.PPTX,
+    FileType.ODT, FileType.ODS, FileType.ODP, FileType.RTF, FileType.TXT
+})
+_IMAGE_TYPES = frozenset({
+    FileType.JPEG, FileType.JPG, FileType.PNG, FileType.TIFF,
+    FileType.TIF, FileType.GIF, FileType.BMP, FileType.WEBP
+})
+_AUDIO_TYPES = frozenset({
+    FileType.MP3, FileType.FLAC, FileType.WAV, FileType.M4A, FileType.OGG
+})
+_VIDEO_TYPES = frozenset({
+    FileType.MP4, FileType.AVI, FileType.MKV, FileType.MOV, FileType.WMV
+})
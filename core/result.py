@@ -1,12 +1,33 @@
 """Result classes for metadata cleaning operations."""
 
 from dataclasses import dataclass, field
-from typing import Dict, List, Optional
+from typing import Dict, IO, Iterator, List, Optional
 from pathlib import Path
 from datetime import datetime
+import json
 
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
 
-@dataclass
+
+def _dumps(obj) -> bytes:
+    """Encode obj as compact UTF-8 JSON, with orjson when installed."""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(obj)
+    return json.dumps(obj, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+
+def _loads(data: bytes):
+    """Decode JSON produced by _dumps."""
+    if ORJSON_AVAILABLE:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+@dataclass(slots=True)
 class CleaningResult:
     """Result of a metadata cleaning operation."""
     
@@ -61,9 +82,17 @@ class CleaningResult:
         }
 
 
-@dataclass
+@dataclass(slots=True)
 class BatchCleaningResult:
-    """Result of batch cleaning operation."""
+    """
+    Result of batch cleaning operation.
+    
+    With stream_path set, each result is appended to that file as a line
+    of JSON instead of being kept in results, so memory stays flat however
+    many files are cleaned; only the counters are held. The file is
+    truncated when the batch is created, so it never holds results of an
+    earlier run.
+    """
     
     total_files: int = 0
     successful: int = 0
@@ -72,10 +101,20 @@ class BatchCleaningResult:
     results: List[CleaningResult] = field(default_factory=list)
     total_time: float = 0.0
     total_size_reduction: int = 0
+    stream_path: Optional[Path] = None
+    _stream: Optional[IO[bytes]] = field(default=None, init=False, repr=False, compare=False)
+    
+    def __post_init__(self):
+        """Open the result stream, dropping lines of an earlier run."""
+        if self.stream_path is not None:
+            self._stream = open(self.stream_path, 'wb')
     
     def add_result(self, result: CleaningResult):
         """Add a cleaning result."""
-        self.results.append(result)
+        if self.stream_path is not None:
+            self._stream.write(_dumps(result.to_dict()) + b"\n")
+        else:
+            self.results.append(result)
         self.total_files += 1
         if result.success:
             self.successful += 1
@@ -83,6 +122,25 @@ class BatchCleaningResult:
         else:
             self.failed += 1
     
+    def close(self):
+        """Flush and close the result stream, if any."""
+        if self._stream is not None:
+            self._stream.close()
+            self._stream = None
+    
+    def iter_results(self) -> Iterator[dict]:
+        """Yield each result as a dictionary, read back from the stream if streaming."""
+        if self.stream_path is None:
+            for result in self.results:
+                yield result.to_dict()
+            return
+        
+        if self._stream is not None:
+            self._stream.flush()
+        with open(self.stream_path, 'rb') as f:
+            for line in f:
+                yield _loads(line)
+    
     @property
     def success_rate(self) -> float:
         """Calculate success rate percentage."""
@@ -90,8 +148,8 @@ class BatchCleaningResult:
             return 0.0
         return (self.successful / self.total_files) * 100
     
-    def to_dict(self) -> dict:
-        """Convert batch result to dictionary."""
+    def _summary(self) -> dict:
+        """Batch totals, without the per-file results."""
         return {
             "total_files": self.total_files,
             "successful": self.successful,
@@ -100,5 +158,27 @@ class BatchCleaningResult:
             "success_rate": round(self.success_rate, 2),
             "total_time": round(self.total_time, 3),
             "total_size_reduction": self.total_size_reduction,
-            "results": [r.to_dict() for r in self.results]
         }
+    
+    def to_dict(self) -> dict:
+        """Convert batch result to dictionary."""
+        batch = self._summary()
+        batch["results"] = list(self.iter_results())
+        return batch
+    
+    def write_json(self, fp: IO[bytes]):
+        """
+        Write the batch as a JSON document to a binary file.
+        
+        The document matches to_dict, but results are encoded and written
+        one at a time (one per line), so the full list of result
+        dictionaries is never held in memory.
+        """
+        fp.write(_dumps(self._summary())[:-1])  # Leave the object open
+        fp.write(b',"results":[')
+        separator = b"\n"
+        for result in self.iter_results():
+            fp.write(separator)
+            fp.write(_dumps(result))
+            separator = b",\n"
+        fp.write(b"\n]}\n")
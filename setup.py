@@ -24,13 +24,11 @@ setup(
         "Topic :: Utilities",
         "License :: OSI Approved :: MIT License",
         "Programming Language :: Python :: 3",
-        "Programming Language :: Python :: 3.8",
-        "Programming Language :: Python :: 3.9",
         "Programming Language :: Python :: 3.10",
         "Programming Language :: Python :: 3.11",
         "Operating System :: OS Independent",
     ],
-    python_requires=">=3.8",
+    python_requires=">=3.10",
     install_requires=[
         "pikepdf>=8.0.0",
         "python-docx>=1.0.0",
@@ -55,6 +53,14 @@ setup(
             "flake8>=6.0.0",
             "mypy>=1.0.0",
         ],
+        "fast": [
+            "blake3>=0.3.0",
+            "orjson>=3.8.0",
+            "xxhash>=3.0.0",
+        ],
+        "server": [
+            "waitress>=2.1.0",
+        ],
     },
     entry_points={
         "console_scripts": [
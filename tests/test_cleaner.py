@@ -18,9 +18,9 @@ class TestMetadataCleaner:
         yield temp_dir
         shutil.rmtree(temp_dir)
     
-    @pytest.fixture
+    @pytest.fixture(scope="session")
     def cleaner(self):
-        """Create cleaner instance."""
+        """Create cleaner instance, shared by all tests."""
         return MetadataCleaner(level=CleaningLevel.DEEP, backup=False)
     
     def test_cleaner_initialization(self):
@@ -49,6 +49,92 @@ class TestMetadataCleaner:
         assert result.success is False
         assert "not found" in result.errors[0].lower()
     
+    def test_clean_many(self, cleaner, temp_dir):
+        """Test process-pool cleaning keeps input order."""
+        pairs = []
+        for i in range(3):
+            test_file = temp_dir / f"test{i}.txt"
+            test_file.write_text(f"content {i}")
+            pairs.append((test_file, temp_dir / f"cleaned{i}.txt"))
+        
+        results = cleaner.clean_many(pairs, max_workers=2)
+        
+        assert [r.file_path for r in results] == [p for p, _ in pairs]
+        assert all(r.success for r in results)
+        assert (temp_dir / "cleaned2.txt").read_text() == "content 2"
+    
+    def test_clean_rtf_with_large_picture(self, cleaner, temp_dir):
+        """Test picture data spanning many read chunks is streamed through."""
+        from metadata_cleaner.cleaners.text_cleaner import _strip_rtf_metadata
+        
+        picture = b"{\\pict\\pngblip " + b"89504e470d0a1a0a" * 200000 + b"}"
+        test_file = temp_dir / "picture.rtf"
+        test_file.write_bytes(b"{\\rtf1{\\info{\\author A}}" + picture + b"{\\*\\company B}Body}")
+        
+        result = cleaner.clean_file(test_file, temp_dir / "cleaned.rtf")
+        
+        assert result.success is True
+        assert (temp_dir / "cleaned.rtf").read_bytes() == b"{\\rtf1" + picture + b"{\\*}Body}"
+        
+        # Hex without braces is settled as it comes, not carried over
+        _, rest = _strip_rtf_metadata(picture[:-1], final=False)
+        assert len(rest) < 64
+    
+    def test_clean_files_result_stream(self, cleaner, temp_dir):
+        """Test streamed batch results are written out instead of kept."""
+        file_paths = []
+        for i in range(3):
+            test_file = temp_dir / f"test{i}.txt"
+            test_file.write_text(f"content {i}")
+            file_paths.append(test_file)
+        stream_path = temp_dir / "results.jsonl"
+        
+        batch_result = cleaner.clean_files(file_paths, result_stream=stream_path)
+        
+        assert batch_result.successful == 3
+        assert batch_result.results == []
+        assert len(stream_path.read_text().splitlines()) == 3
+        assert {r["file_path"] for r in batch_result.iter_results()} == {str(p) for p in file_paths}
+    
+    def test_clean_folder_skips_relative_backup_dir(self, temp_dir, monkeypatch):
+        """Test a relative backup folder inside the cleaned folder is not walked."""
+        folder = temp_dir / "docs"
+        (folder / "backups").mkdir(parents=True)
+        (folder / "backups" / "old.txt").write_text("backup")
+        (folder / "note.txt").write_text("note")
+        monkeypatch.chdir(temp_dir)
+        cleaner = MetadataCleaner(backup=True, backup_dir=Path("docs/backups"))
+        
+        batch_result = cleaner.clean_folder(folder, recursive=True)
+        
+        assert batch_result.total_files == 1
+    
+    def test_empty_result_stream_drops_old_results(self, cleaner, temp_dir):
+        """Test an empty streamed batch does not read back an earlier run."""
+        stream_path = temp_dir / "results.jsonl"
+        stream_path.write_text('{"file_path": "old.txt"}\n')
+        
+        batch_result = cleaner.clean_files([], result_stream=stream_path)
+        
+        assert list(batch_result.iter_results()) == []
+    
+    def test_batch_write_json_matches_to_dict(self, cleaner, temp_dir):
+        """Test the streamed JSON report decodes to the same document as to_dict."""
+        import io
+        import json
+        
+        file_paths = []
+        for i in range(2):
+            test_file = temp_dir / f"test{i}.txt"
+            test_file.write_text(f"content {i}")
+            file_paths.append(test_file)
+        batch_result = cleaner.clean_files(file_paths)
+        
+        buffer = io.BytesIO()
+        batch_result.write_json(buffer)
+        
+        assert json.loads(buffer.getvalue()) == batch_result.to_dict()
+    
     def test_cleaning_levels(self):
         """Test different cleaning levels."""
         basic = MetadataCleaner(level=CleaningLevel.BASIC)
@@ -96,9 +182,274 @@ class TestFileTypeDetection:
         assert FileType.from_extension('.avi').is_video()
 
 
+class TestImageCleaner:
+    """Test ImageCleaner class."""
+    
+    def test_clean_batch(self, tmp_path):
+        """Test batch cleaning returns one outcome per file."""
+        from PIL import Image
+        from metadata_cleaner.cleaners import ImageCleaner
+        
+        pairs = []
+        for i in range(3):
+            input_path = tmp_path / f"image{i}.png"
+            Image.new('RGB', (8, 8), (i, i, i)).save(input_path)
+            pairs.append((input_path, tmp_path / f"cleaned{i}.png"))
+        
+        outcomes = ImageCleaner.clean_batch(pairs, CleaningLevel.DEEP)
+        
+        assert len(outcomes) == 3
+        for (success, cleaner), (_, output_path) in zip(outcomes, pairs):
+            assert success is True
+            assert cleaner.errors == []
+            assert output_path.exists()
+
+    
+    @pytest.fixture
+    def fake_exiftool(self, monkeypatch):
+        """Replace ExifTool with a stand-in that rejects files named bad.*"""
+        import threading
+        import time
+        from metadata_cleaner.cleaners import image_cleaner
+        
+        class FakeExifTool:
+            overlaps = 0
+            busy = threading.Lock()
+            
+            def __init__(self):
+                self.running = False
+            
+            def run(self):
+                self.running = True
+            
+            def terminate(self):
+                self.running = False
+            
+            def get_metadata(self, paths):
+                return [{"EXIF:Make": "Canon"} for _ in paths]
+            
+            def execute(self, *args):
+                # Count calls that arrive while another is in progress
+                if not FakeExifTool.busy.acquire(blocking=False):
+                    FakeExifTool.overlaps += 1
+                    return
+                try:
+                    time.sleep(0.001)
+                    if Path(args[-1].decode()).stem == "bad":
+                        raise RuntimeError("exiftool error")
+                finally:
+                    FakeExifTool.busy.release()
+        
+        class FakeModule:
+            ExifToolHelper = FakeExifTool
+        
+        monkeypatch.setattr(image_cleaner, "exiftool", FakeModule, raising=False)
+        monkeypatch.setattr(image_cleaner, "EXIFTOOL_AVAILABLE", True)
+        return FakeExifTool
+    
+    def test_exiftool_failure_falls_back_per_file(self, tmp_path, fake_exiftool):
+        """Test only the files ExifTool rejects are cleaned with PIL."""
+        from PIL import Image
+        from metadata_cleaner.cleaners import ImageCleaner
+        
+        pairs = []
+        for name in ("good.png", "bad.png"):
+            input_path = tmp_path / name
+            Image.new('RGB', (8, 8)).save(input_path)
+            pairs.append((input_path, tmp_path / f"cleaned_{name}"))
+        
+        outcomes = ImageCleaner.clean_batch(pairs, CleaningLevel.DEEP)
+        
+        assert [success for success, _ in outcomes] == [True, True]
+        # The rewritten file keeps ExifTool's report; only the other is re-read
+        assert outcomes[0][1].metadata_removed == {"EXIF:Make": "Canon"}
+        assert "EXIF:Make" not in outcomes[1][1].metadata_removed
+    
+    def test_shared_exiftool_takes_one_command_at_a_time(self, tmp_path, fake_exiftool):
+        """Test threads sharing a cleaner never interleave on its ExifTool process."""
+        from concurrent.futures import ThreadPoolExecutor
+        from PIL import Image
+        
+        paths = []
+        for i in range(16):
+            input_path = tmp_path / f"image{i}.png"
+            Image.new('RGB', (8, 8)).save(input_path)
+            paths.append(input_path)
+        cleaner = MetadataCleaner(level=CleaningLevel.DEEP, backup=False, verify=False)
+        
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            results = list(executor.map(cleaner.clean_file, paths))
+        et = cleaner.cleaners['image']._et
+        cleaner.close()
+        
+        assert all(result.success for result in results)
+        assert fake_exiftool.overlaps == 0
+        assert et.running is False
+    
+    def test_jpeg_cleaning_is_lossless(self, tmp_path):
+        """Test JPEG metadata is stripped without re-encoding."""
+        from PIL import Image
+        from metadata_cleaner.cleaners import ImageCleaner
+        
+        exif = Image.Exif()
+        exif[0x010f] = "Canon"  # Make
+        input_path = tmp_path / "photo.jpg"
+        output_path = tmp_path / "cleaned.jpg"
+        Image.new('RGB', (16, 16), (200, 10, 10)).save(input_path, exif=exif)
+        
+        cleaner = ImageCleaner(CleaningLevel.BASIC)
+        assert cleaner.clean(input_path, output_path) is True
+        assert cleaner.metadata_removed["EXIF.Make"] == "Canon"
+        
+        with Image.open(input_path) as original, Image.open(output_path) as cleaned:
+            assert not cleaned.getexif()
+            assert cleaned.tobytes() == original.tobytes()
+    
+    def test_results_keep_their_own_metadata(self, tmp_path):
+        """Test cleaning a second file leaves the first result unchanged."""
+        from PIL import Image
+        
+        paths = []
+        for make in ("Canon", "Nikon"):
+            exif = Image.Exif()
+            exif[0x010f] = make  # Make
+            input_path = tmp_path / f"{make}.jpg"
+            Image.new('RGB', (8, 8)).save(input_path, exif=exif)
+            paths.append(input_path)
+        cleaner = MetadataCleaner(level=CleaningLevel.BASIC, backup=False)
+        
+        first = cleaner.clean_file(paths[0], tmp_path / "cleaned0.jpg")
+        second = cleaner.clean_file(paths[1], tmp_path / "cleaned1.jpg")
+        
+        assert first.metadata_removed is not second.metadata_removed
+        assert first.metadata_removed["EXIF.Make"] == "Canon"
+        assert second.metadata_removed["EXIF.Make"] == "Nikon"
+    
+    def test_png_metadata_read_without_decoding(self, tmp_path):
+        """Test PNG chunks are read by seeking, matching what Pillow decodes."""
+        from PIL import Image, PngImagePlugin
+        from metadata_cleaner.cleaners import ImageCleaner
+        
+        info = PngImagePlugin.PngInfo()
+        info.add_text("Author", "Someone")
+        info.add_itxt("Title", "Holiday", zip=True)
+        exif = Image.Exif()
+        exif[0x010f] = "Canon"  # Make
+        input_path = tmp_path / "image.png"
+        Image.new('RGB', (8, 8)).save(input_path, pnginfo=info, exif=exif)
+        
+        cleaner = ImageCleaner(CleaningLevel.BASIC)
+        metadata = cleaner._extract_pil_metadata(input_path)
+        
+        assert metadata["EXIF.Make"] == "Canon"
+        assert metadata["Info.Title"] == "Holiday"
+        with Image.open(input_path) as img:
+            assert metadata == cleaner._collect_pil_metadata(img)
+
+
+class TestVideoCleaner:
+    """Test video container metadata reading."""
+    
+    @staticmethod
+    def _box(box_type, payload):
+        """Build an MP4 box."""
+        return (8 + len(payload)).to_bytes(4, 'big') + box_type + payload
+    
+    def test_quicktime_keyed_metadata(self, tmp_path):
+        """Test QuickTime items named through the keys box are reported."""
+        from metadata_cleaner.cleaners.video_cleaner import _read_quicktime_metadata
+        box = self._box
+        
+        key = b'com.apple.quicktime.location.ISO6709'
+        value = box(b'data', (1).to_bytes(4, 'big') + b'\0' * 4 + b'+40.0000-074.0000/')
+        meta = box(b'meta',
+                   box(b'hdlr', b'\0' * 8 + b'mdta' + b'\0' * 13)
+                   + box(b'keys', b'\0' * 4 + (1).to_bytes(4, 'big') + box(b'mdta', key))
+                   + box(b'ilst', box((1).to_bytes(4, 'big'), value)))
+        test_file = tmp_path / "location.mov"
+        test_file.write_bytes(
+            box(b'ftyp', b'qt  \0\0\0\0qt  ')
+            + box(b'moov', box(b'mvhd', b'\0' * 100) + meta)
+            + box(b'mdat', b'\0' * 64)
+        )
+        
+        metadata = _read_quicktime_metadata(test_file)
+        
+        assert metadata == {'Format.com.apple.quicktime.location.ISO6709': '+40.0000-074.0000/'}
+    
+    def test_user_data_location_and_creation_time(self, tmp_path):
+        """Test a ©xyz location and the movie creation time are reported."""
+        from metadata_cleaner.cleaners.video_cleaner import _read_quicktime_metadata
+        box = self._box
+        
+        location = b'+40.0000-074.0000/'
+        created = (3797409600).to_bytes(4, 'big')  # 2024-05-01 12:00 UTC
+        mvhd = box(b'mvhd', b'\0' * 4 + created + b'\0' * 4 + (1000).to_bytes(4, 'big') + b'\0' * 84)
+        udta = box(b'udta', box(b'\xa9xyz', len(location).to_bytes(2, 'big') + b'\x15\xc7' + location))
+        test_file = tmp_path / "phone.mp4"
+        test_file.write_bytes(
+            box(b'ftyp', b'isom\0\0\0\0isom')
+            + box(b'moov', mvhd + udta)
+            + box(b'mdat', b'\0' * 64)
+        )
+        
+        metadata = _read_quicktime_metadata(test_file)
+        
+        assert metadata == {
+            'Format.creation_time': '2024-05-01T12:00:00+00:00',
+            'Format.location': '+40.0000-074.0000/',
+        }
+
+
+class TestMetadataCache:
+    """Test cached metadata extraction."""
+    
+    def test_extract_metadata_cached_until_file_changes(self, tmp_path):
+        """Test repeated extraction is served from cache until the file changes."""
+        from metadata_cleaner.cleaners import TextCleaner
+        
+        calls = []
+        
+        class CountingCleaner(TextCleaner):
+            def _extract_metadata(self, file_path):
+                calls.append(file_path)
+                return super()._extract_metadata(file_path)
+        
+        test_file = tmp_path / "doc.rtf"
+        test_file.write_text("{\\rtf1{\\info{\\author Someone}}}")
+        cleaner = CountingCleaner()
+        
+        first = cleaner.extract_metadata(test_file)
+        assert first == {'Author': 'Present'}
+        assert cleaner.extract_metadata(test_file) == first
+        assert len(calls) == 1
+        
+        test_file.write_text("{\\rtf1 plain}")
+        assert cleaner.extract_metadata(test_file) == {}
+        assert len(calls) == 2
+
+
 class TestUtils:
     """Test utility functions."""
     
+    def test_copy_file_when_kernel_copies_nothing(self, tmp_path, monkeypatch):
+        """Test copies are completed when copy_file_range reports 0 bytes."""
+        import os
+        from metadata_cleaner.core import utils
+        
+        def no_reflink(*args):
+            raise OSError("no reflinks")
+        
+        if utils.fcntl is not None:
+            monkeypatch.setattr(utils.fcntl, "ioctl", no_reflink)
+        monkeypatch.setattr(os, "copy_file_range", lambda *args: 0, raising=False)
+        src = tmp_path / "src.bin"
+        src.write_bytes(b"data" * 1000)
+        
+        utils.copy_file(src, tmp_path / "dst.bin")
+        
+        assert (tmp_path / "dst.bin").read_bytes() == src.read_bytes()
+    
     def test_file_hash(self, tmp_path):
         """Test file hash calculation."""
         from metadata_cleaner.core.utils import calculate_file_hash
@@ -112,6 +463,17 @@ class TestUtils:
         assert hash1 == hash2
         assert len(hash1) == 64  # SHA256 hash length
     
+    def test_file_hash_xxh3(self, tmp_path):
+        """Test xxHash file hashing matches a one-shot digest."""
+        xxhash = pytest.importorskip("xxhash")
+        from metadata_cleaner.core.utils import calculate_file_hash
+        
+        test_file = tmp_path / "test.txt"
+        test_file.write_text("test content")
+        
+        assert calculate_file_hash(test_file, "xxh3_64") == xxhash.xxh3_64(b"test content").hexdigest()
+        assert len(calculate_file_hash(test_file, "xxh3_128")) == 32
+    
     def test_backup_creation(self, tmp_path):
         """Test backup file creation."""
         from metadata_cleaner.core.utils import create_backup
@@ -124,6 +486,18 @@ class TestUtils:
         assert backup_path.exists()
         assert backup_path.read_text() == "test content"
     
+    def test_hashed_backup_matches_content_hash(self, tmp_path):
+        """Test the fused backup copy hashes the same as a separate pass."""
+        from metadata_cleaner.core.utils import calculate_content_hash, create_hashed_backup
+        
+        test_file = tmp_path / "test.txt"
+        test_file.write_text("test content")
+        
+        backup_path, content_hash = create_hashed_backup(test_file)
+        
+        assert backup_path.read_text() == "test content"
+        assert content_hash == calculate_content_hash(test_file)
+    
     def test_file_size(self, tmp_path):
         """Test file size calculation."""
         from metadata_cleaner.core.utils import get_file_size
@@ -134,6 +508,68 @@ class TestUtils:
         
         size = get_file_size(test_file)
         assert size == len(content.encode())
+    
+    def test_file_sizes(self, tmp_path):
+        """Test directory file sizes come from one listing."""
+        from metadata_cleaner.core.utils import get_file_sizes
+        
+        (tmp_path / "sub").mkdir()
+        (tmp_path / "a.txt").write_text("abc")
+        (tmp_path / "b.txt").write_text("")
+        
+        assert get_file_sizes(tmp_path) == {"a.txt": 3, "b.txt": 0}
+        assert get_file_sizes(tmp_path, {"a.txt", "gone.txt"}) == {"a.txt": 3}
+    
+    def test_iter_files_skips_backups(self, tmp_path):
+        """Test folder walking skips backup folders."""
+        from metadata_cleaner.core.utils import iter_files, BACKUP_DIR_NAME
+        
+        (tmp_path / "sub").mkdir()
+        (tmp_path / BACKUP_DIR_NAME).mkdir()
+        (tmp_path / "top.txt").write_text("a")
+        (tmp_path / "sub" / "nested.txt").write_text("b")
+        (tmp_path / BACKUP_DIR_NAME / "old.txt").write_text("c")
+        
+        assert {p.name for p in iter_files(tmp_path)} == {"top.txt"}
+        assert {p.name for p in iter_files(tmp_path, recursive=True)} == {"top.txt", "nested.txt"}
+
+
+
+class TestWebApp:
+    """Test the Flask web interface."""
+    
+    def test_concurrent_requests_keep_their_own_results(self):
+        """Test pooled cleaners do not mix up results of concurrent requests."""
+        import io
+        import threading
+        import time
+        from concurrent.futures import ThreadPoolExecutor
+        pytest.importorskip("flask")
+        from metadata_cleaner import web
+        
+        documents = {
+            "author.rtf": (b"{\\rtf1{\\info{\\author A}}Body}", {"Author"}),
+            "company.rtf": (b"{\\rtf1{\\info{\\company B}{\\creatim C}}Body}", {"Company", "CreationTime"}),
+        }
+        
+        def post(name):
+            data, _ = documents[name]
+            # Unique content per request, so every upload is cleaned
+            data += f"{{{threading.get_ident()}-{time.perf_counter_ns()}}}".encode()
+            response = web.app.test_client().post(
+                '/api/clean',
+                data={'file': (io.BytesIO(data), name)},
+                content_type='multipart/form-data'
+            )
+            return name, response.get_json()
+        
+        names = list(documents) * 20
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            responses = list(executor.map(post, names))
+        
+        for name, payload in responses:
+            assert payload['success'] is True
+            assert set(payload['metadata_removed']) == documents[name][1]
 
 
 if __name__ == '__main__':
@@ -1,19 +1,242 @@
 """Web GUI for metadata cleaner using Flask."""
 
+import atexit
 import os
+import re
 import json
+import hashlib
+import queue
+import threading
+from functools import lru_cache
 from pathlib import Path
-from flask import Flask, render_template, request, jsonify, send_file
+from flask import Flask, Request, render_template, request, jsonify, send_file
+from flask.json.provider import DefaultJSONProvider
 from werkzeug.utils import secure_filename
+from werkzeug.wsgi import FileWrapper
 import tempfile
 import shutil
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+try:
+    from waitress import serve
+    WAITRESS_AVAILABLE = True
+except ImportError:
+    WAITRESS_AVAILABLE = False
 
 from .core.cleaner import MetadataCleaner
 from .core.enums import CleaningLevel
+from .core.utils import calculate_file_hash, copy_file, is_supported_name
+
+# Upload requests larger than this spool file parts to disk, as Werkzeug does
+UPLOAD_SPOOL_THRESHOLD = 500 * 1024
+
+
+class OrjsonProvider(DefaultJSONProvider):
+    """JSON provider encoding jsonify responses with orjson, straight to bytes."""
+    
+    def response(self, *args, **kwargs):
+        """Serialize the arguments as a JSON response, as DefaultJSONProvider does."""
+        obj = self._prepare_response_obj(args, kwargs)
+        option = orjson.OPT_APPEND_NEWLINE | orjson.OPT_NON_STR_KEYS
+        if self.sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        if (self.compact is None and self._app.debug) or self.compact is False:
+            option |= orjson.OPT_INDENT_2
+        return self._app.response_class(
+            orjson.dumps(obj, default=self.default, option=option),
+            mimetype=self.mimetype
+        )
+
+
+class UploadRequest(Request):
+    """Request that spools large file uploads to named temporary files."""
+    
+    def _get_file_stream(self, total_content_length, content_type, filename=None, content_length=None):
+        """
+        Spool a file part to disk for large requests, like Werkzeug's
+        default, but under a name, so _link_upload can link it into place
+        instead of copying it. Small requests stay in memory.
+        """
+        if total_content_length is None or total_content_length > UPLOAD_SPOOL_THRESHOLD:
+            return tempfile.NamedTemporaryFile('w+b', prefix='mc_upload_')
+        return super()._get_file_stream(total_content_length, content_type, filename, content_length)
+
 
 app = Flask(__name__)
+app.request_class = UploadRequest
+if ORJSON_AVAILABLE:
+    app.json = OrjsonProvider(app)
 app.config['MAX_CONTENT_LENGTH'] = 100 * 1024 * 1024  # 100MB max file size
 app.config['UPLOAD_FOLDER'] = tempfile.mkdtemp()
+# Behind nginx or Apache, let the proxy send downloads from disk itself
+app.config['USE_X_SENDFILE'] = os.environ.get('METADATA_CLEANER_X_SENDFILE') == '1'
+
+# Cleaning levels by form value
+_LEVEL_MAP = {
+    'basic': CleaningLevel.BASIC,
+    'deep': CleaningLevel.DEEP,
+    'paranoid': CleaningLevel.PARANOID
+}
+
+# Cleaned uploads by SHA-256 of the upload, extension and level, as a
+# {key}.bin cleaned file and a {key}.json of response fields. Identical
+# uploads are served from here without being cleaned again; least recently
+# used entries (by .bin mtime) are evicted beyond CLEANED_CACHE_MAX_BYTES
+CLEANED_CACHE_DIR = Path(app.config['UPLOAD_FOLDER']) / '_hashcache'
+CLEANED_CACHE_MAX_BYTES = 256 * 1024 * 1024
+_cleaned_cache_lock = threading.Lock()
+
+# A hex SHA-256 digest, as accepted by /api/clean/<digest>
+_DIGEST_RE = re.compile(r'[0-9a-f]{64}')
+
+# Idle cleaners per level, reused across requests. Cleaners keep per-file
+# state, so each is used by one thread at a time; more are created when all
+# are busy, so the pool grows to the peak number of concurrent cleans
+_IDLE_CLEANERS = {level: queue.SimpleQueue() for level in CleaningLevel}
+
+# Names secure_filename returns unchanged: ASCII letters, digits and ._-,
+# not starting or ending with . or _
+_PLAIN_FILENAME_RE = re.compile(r'[A-Za-z0-9-](?:[A-Za-z0-9._-]*[A-Za-z0-9-])?')
+
+# Read size when saving uploads; Werkzeug's default is 16 KiB
+UPLOAD_CHUNK_SIZE = 4 * 1024 * 1024
+
+# Read size when streaming downloads through Python
+DOWNLOAD_CHUNK_SIZE = 1024 * 1024
+
+
+def _download_file_wrapper(file, buffer_size=8192):
+    """Wrap downloads for servers without a file wrapper, in large reads."""
+    return FileWrapper(file, DOWNLOAD_CHUNK_SIZE)
+
+
+def _link_upload(file, path: Path) -> bool:
+    """
+    Hard-link an upload spooled to a named file (see UploadRequest) to
+    path, so it is not copied. Returns False if it has to be copied.
+    """
+    stream = file.stream
+    name = getattr(stream, 'name', None)
+    if not isinstance(name, str):
+        return False  # In memory or unnamed
+    try:
+        stream.flush()
+        os.link(name, path)
+    except OSError:
+        return False  # Other filesystem, or no hard links
+    return True
+
+
+def _save_upload(file, path: Path) -> str:
+    """Save an upload to path, returning the SHA-256 of its content."""
+    if _link_upload(file, path):
+        return calculate_file_hash(path)
+    
+    # Hash from the same read that copies it
+    stream = file.stream
+    digest = hashlib.sha256()
+    with open(path, 'wb') as f:
+        for chunk in iter(lambda: stream.read(UPLOAD_CHUNK_SIZE), b''):
+            digest.update(chunk)
+            f.write(chunk)
+    return digest.hexdigest()
+
+
+@lru_cache(maxsize=256)
+def _secure_filename(name: str) -> str:
+    """secure_filename, skipping its normalisation passes for plain names."""
+    # Windows also renames device names such as CON, so always check there
+    if os.name != 'nt' and _PLAIN_FILENAME_RE.fullmatch(name):
+        return name
+    return secure_filename(name)
+
+
+def _clean(level: CleaningLevel, input_path: Path, output_path: Path):
+    """Clean a file with an idle cleaner for level, returning its CleaningResult."""
+    idle = _IDLE_CLEANERS[level]
+    try:
+        cleaner = idle.get_nowait()
+    except queue.Empty:
+        cleaner = MetadataCleaner(level=level, backup=False, verify=True)
+    try:
+        return cleaner.clean_file(input_path, output_path)
+    finally:
+        idle.put(cleaner)
+
+
+@atexit.register
+def _close_idle_cleaners():
+    """Stop the backend processes of pooled cleaners when the server exits."""
+    for idle in _IDLE_CLEANERS.values():
+        while True:
+            try:
+                idle.get_nowait().close()
+            except queue.Empty:
+                break
+
+
+def _cache_key(digest: str, filename: str, level: CleaningLevel) -> str:
+    """Name cache entries for an upload's content, extension and level."""
+    suffix = Path(filename).suffix.lower().lstrip('.')
+    return f"{digest}_{suffix}_{level.name.lower()}"
+
+
+def _cache_get(key: str, output_path: Path):
+    """Copy a cached cleaned file to output_path, returning its response fields or None."""
+    cached_path = CLEANED_CACHE_DIR / f"{key}.bin"
+    try:
+        fields = json.loads((CLEANED_CACHE_DIR / f"{key}.json").read_bytes())
+        copy_file(cached_path, output_path)
+        os.utime(cached_path)  # Mark as recently used
+    except (OSError, ValueError):
+        return None
+    return fields
+
+
+def _cache_put(key: str, fields: dict, output_path: Path):
+    """Cache a cleaned file and its response fields, then evict down to budget."""
+    CLEANED_CACHE_DIR.mkdir(exist_ok=True)
+    # Write under temporary names and rename, so readers never see partial
+    # entries; the .json goes last since lookups start from it
+    for name, write in (
+        (f"{key}.bin", lambda tmp: copy_file(output_path, tmp)),
+        (f"{key}.json", lambda tmp: tmp.write_text(json.dumps(fields))),
+    ):
+        fd, tmp_name = tempfile.mkstemp(dir=CLEANED_CACHE_DIR, suffix='.tmp')
+        os.close(fd)
+        try:
+            write(Path(tmp_name))
+            os.replace(tmp_name, CLEANED_CACHE_DIR / name)
+        except BaseException:
+            os.unlink(tmp_name)
+            raise
+    
+    with _cleaned_cache_lock:
+        entries = []
+        total = 0
+        with os.scandir(CLEANED_CACHE_DIR) as it:
+            for entry in it:
+                if entry.name.endswith('.bin'):
+                    st = entry.stat()
+                    entries.append((st.st_mtime, st.st_size, entry.name[:-4]))
+                    total += st.st_size
+        if total <= CLEANED_CACHE_MAX_BYTES:
+            return
+        for _, size, old_key in sorted(entries):
+            for ext in ('.json', '.bin'):
+                try:
+                    os.unlink(CLEANED_CACHE_DIR / f"{old_key}{ext}")
+                except FileNotFoundError:
+                    pass
+            total -= size
+            if total <= CLEANED_CACHE_MAX_BYTES:
+                break
 
 
 @app.route('/')
@@ -35,43 +258,85 @@ def clean_file():
             return jsonify({'error': 'No file selected'}), 400
         
         # Get cleaning level
-        level_str = request.form.get('level', 'deep')
-        level_map = {
-            'basic': CleaningLevel.BASIC,
-            'deep': CleaningLevel.DEEP,
-            'paranoid': CleaningLevel.PARANOID
-        }
-        level = level_map.get(level_str, CleaningLevel.DEEP)
+        filename = _secure_filename(file.filename)
+        if not filename:
+            return jsonify({'error': 'Invalid file name'}), 400
+        if not is_supported_name(filename):
+            # Rejected before the spooled upload is linked into the
+            # upload folder or cleaned
+            return jsonify({'error': f"Unsupported file type: {Path(filename).suffix}"}), 415
         
-        # Save uploaded file
-        filename = secure_filename(file.filename)
-        input_path = Path(app.config['UPLOAD_FOLDER']) / filename
-        file.save(input_path)
+        level = _LEVEL_MAP.get(request.form.get('level', 'deep'), CleaningLevel.DEEP)
         
-        # Clean the file
-        output_path = Path(app.config['UPLOAD_FOLDER']) / f"cleaned_{filename}"
+        # Uploads are saved to a per-request folder, removed afterwards; only
+        # the cleaned file is kept for download
+        with tempfile.TemporaryDirectory(prefix='mc_') as upload_dir:
+            # Save uploaded file, hashing it on the way
+            input_path = Path(upload_dir) / filename
+            output_path = Path(app.config['UPLOAD_FOLDER']) / f"cleaned_{filename}"
+            cache_key = _cache_key(_save_upload(file, input_path), filename, level)
+            
+            # Identical content cleaned before at this level is served from the
+            # cache instead of being cleaned again
+            fields = _cache_get(cache_key, output_path)
+            if fields is not None:
+                return jsonify({'success': True, 'filename': f"cleaned_{filename}", **fields})
+            
+            # Clean the file
+            result = _clean(level, input_path, output_path)
+            
+            if result.success:
+                fields = {
+                    'original_size': result.original_size,
+                    'cleaned_size': result.cleaned_size,
+                    'size_reduction': result.size_reduction,
+                    'size_reduction_percent': result.size_reduction_percent,
+                    'metadata_removed': result.metadata_removed,
+                    'metadata_count': result.metadata_count,
+                    'warnings': result.warnings
+                }
+                _cache_put(cache_key, fields, output_path)
+                
+                # Return cleaned file info
+                return jsonify({'success': True, 'filename': f"cleaned_{filename}", **fields})
+            else:
+                return jsonify({
+                    'success': False,
+                    'errors': result.errors
+                }), 400
+    
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
+@app.route('/api/clean/<digest>', methods=['GET', 'HEAD'])
+def cached_clean(digest):
+    """
+    Get the result of a cached upload by its SHA-256, without uploading it.
+    
+    Clients hash the file locally (e.g. crypto.subtle.digest('SHA-256'))
+    and pass the file name and level as the upload would. HEAD answers 200
+    if the content is cached and 404 if not; GET also makes the cleaned
+    file available for download and returns the same JSON as
+    POST /api/clean. On 404 the client uploads the file as usual.
+    """
+    try:
+        digest = digest.lower()
+        filename = _secure_filename(request.args.get('filename', ''))
+        if not _DIGEST_RE.fullmatch(digest) or not filename:
+            return jsonify({'error': 'Expected a SHA-256 digest and a file name'}), 400
         
-        cleaner = MetadataCleaner(level=level, backup=False, verify=True)
-        result = cleaner.clean_file(input_path, output_path)
+        level = _LEVEL_MAP.get(request.args.get('level', 'deep'), CleaningLevel.DEEP)
+        cache_key = _cache_key(digest, filename, level)
+        if request.method == 'HEAD':
+            found = (CLEANED_CACHE_DIR / f"{cache_key}.json").exists()
+            return '', 200 if found else 404
         
-        if result.success:
-            # Return cleaned file info
-            return jsonify({
-                'success': True,
-                'filename': f"cleaned_{filename}",
-                'original_size': result.original_size,
-                'cleaned_size': result.cleaned_size,
-                'size_reduction': result.size_reduction,
-                'size_reduction_percent': result.size_reduction_percent,
-                'metadata_removed': result.metadata_removed,
-                'metadata_count': result.metadata_count,
-                'warnings': result.warnings
-            })
-        else:
-            return jsonify({
-                'success': False,
-                'errors': result.errors
-            }), 400
+        output_path = Path(app.config['UPLOAD_FOLDER']) / f"cleaned_{filename}"
+        fields = _cache_get(cache_key, output_path)
+        if fields is None:
+            return jsonify({'error': 'Not cached'}), 404
+        return jsonify({'success': True, 'filename': f"cleaned_{filename}", **fields})
     
     except Exception as e:
         return jsonify({'error': str(e)}), 500
@@ -81,10 +346,14 @@ def clean_file():
 def download_file(filename):
     """Download cleaned file."""
     try:
-        file_path = Path(app.config['UPLOAD_FOLDER']) / secure_filename(filename)
-        if not file_path.exists():
+        safe_name = _secure_filename(filename)
+        file_path = Path(app.config['UPLOAD_FOLDER']) / safe_name
+        if not safe_name or not file_path.is_file():
             return jsonify({'error': 'File not found'}), 404
         
+        # A server's own wrapper (e.g. gunicorn's, using sendfile) is kept;
+        # otherwise the file is streamed in DOWNLOAD_CHUNK_SIZE reads, not 8 KiB
+        request.environ.setdefault('wsgi.file_wrapper', _download_file_wrapper)
         return send_file(
             file_path,
             as_attachment=True,
@@ -102,29 +371,35 @@ def batch_clean():
         if not files:
             return jsonify({'error': 'No files uploaded'}), 400
         
-        level_str = request.form.get('level', 'deep')
-        level_map = {
-            'basic': CleaningLevel.BASIC,
-            'deep': CleaningLevel.DEEP,
-            'paranoid': CleaningLevel.PARANOID
-        }
-        level = level_map.get(level_str, CleaningLevel.DEEP)
-        
-        cleaner = MetadataCleaner(level=level, backup=False, verify=True)
-        results = []
+        level = _LEVEL_MAP.get(request.form.get('level', 'deep'), CleaningLevel.DEEP)
+        output_dir = Path(app.config['UPLOAD_FOLDER'])
         
-        for file in files:
-            if file.filename == '':
-                continue
+        def clean_upload(file, filename, upload_dir):
+            # Rejected before the spooled upload is linked into the
+            # upload folder or cleaned
+            if not filename:
+                error = 'Invalid file name'
+            elif not is_supported_name(filename):
+                error = f"Unsupported file type: {Path(filename).suffix}"
+            else:
+                error = None
+            if error:
+                return {
+                    'filename': filename,
+                    'success': False,
+                    'cleaned_filename': None,
+                    'errors': [error],
+                    'warnings': []
+                }
             
-            filename = secure_filename(file.filename)
-            input_path = Path(app.config['UPLOAD_FOLDER']) / filename
-            output_path = Path(app.config['UPLOAD_FOLDER']) / f"cleaned_{filename}"
+            input_path = upload_dir / filename
+            output_path = output_dir / f"cleaned_{filename}"
             
-            file.save(input_path)
-            result = cleaner.clean_file(input_path, output_path)
+            if not _link_upload(file, input_path):
+                file.save(input_path, buffer_size=UPLOAD_CHUNK_SIZE)
+            result = _clean(level, input_path, output_path)
             
-            results.append({
+            return {
                 'filename': filename,
                 'success': result.success,
                 'cleaned_filename': f"cleaned_{filename}" if result.success else None,
@@ -134,7 +409,23 @@ def batch_clean():
                 'metadata_count': result.metadata_count,
                 'errors': result.errors,
                 'warnings': result.warnings
-            })
+            }
+        
+        # Save and clean the uploads in parallel, keeping their order
+        uploads = [file for file in files if file.filename != '']
+        filenames = [_secure_filename(file.filename) for file in uploads]
+        results = []
+        if uploads:
+            workers = min(len(uploads), (os.cpu_count() or 1) * 2)
+            if len(set(filenames)) < len(filenames):
+                workers = 1  # Same-named uploads share paths; clean them in turn
+            # Uploads are saved to a per-request folder, removed afterwards
+            with tempfile.TemporaryDirectory(prefix='mc_') as upload_dir, \
+                    ThreadPoolExecutor(max_workers=workers) as executor:
+                upload_dir = Path(upload_dir)
+                results = list(executor.map(
+                    clean_upload, uploads, filenames, [upload_dir] * len(uploads)
+                ))
         
         return jsonify({'results': results})
     
@@ -143,7 +434,13 @@ def batch_clean():
 
 
 def run_server(host='0.0.0.0', port=5000, debug=False):
-    """Run Flask development server."""
+    """
+    Run the web server.
+    
+    Served by waitress, a multi-threaded production WSGI server, when it is
+    installed; otherwise, and always in debug mode, by the Flask
+    development server.
+    """
     print(f"""
 ╔═══════════════════════════════════════════════════════════╗
 ║           METADATA CLEANER - Web Interface               ║
@@ -152,7 +449,10 @@ def run_server(host='0.0.0.0', port=5000, debug=False):
 Server running at: http://localhost:{port}
 Press Ctrl+C to stop
     """)
-    app.run(host=host, port=port, debug=debug)
+    if WAITRESS_AVAILABLE and not debug:
+        serve(app, host=host, port=port, threads=(os.cpu_count() or 1) * 2)
+    else:
+        app.run(host=host, port=port, debug=debug, threaded=True)
 
 
 if __name__ == '__main__':